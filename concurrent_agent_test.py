@@ -12,10 +12,16 @@ can be run simultaneously. It explores:
 5. Error handling in concurrent scenarios
 """
 
+import argparse
 import asyncio
+import contextvars
+import functools
+import hashlib
 import time
 import threading
-import concurrent.futures
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 import json
 from datetime import datetime
@@ -31,29 +37,219 @@ except Exception as e:
 # Import your functional API agent
 from functional_api_agent import agent
 
+# Optional orjson dependency for fast result serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Optional uvloop event loop (not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Optional tenacity dependency for rate-limit backoff
+try:
+    from openai import RateLimitError
+    from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+    TENACITY_AVAILABLE = True
+except ImportError:
+    TENACITY_AVAILABLE = False
+
+# Maximum number of in-flight agent calls during the stress test
+MAX_CONCURRENCY = 8
+
+# Worker threads for the loop's default executor. LLM calls are async; what runs there is
+# asyncio.to_thread work: the React agent's embedding/search calls and result truncation
+MAX_WORKERS = 32
+
+RESULTS_FILE = "concurrent_test_results.json"
+RESULTS_LOG_FILE = "concurrent_test_results.jsonl"
+
+
+def dumps_bytes(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+async def ainvoke_with_retry(query: str, config: Dict[str, Any]):
+    """Invoke the agent, backing off exponentially on Azure OpenAI rate limits."""
+    if not TENACITY_AVAILABLE:
+        return await agent.ainvoke(query, config)
+    
+    async for attempt in AsyncRetrying(
+        retry=retry_if_exception_type(RateLimitError),
+        wait=wait_exponential(multiplier=1, max=30),
+        stop=stop_after_attempt(5),
+        reraise=True
+    ):
+        with attempt:
+            return await agent.ainvoke(query, config)
+
+
+@functools.lru_cache(maxsize=None)
+def session_config(thread_id: str) -> Dict[str, Any]:
+    """Build the run config for a session once and reuse it; treat as read-only"""
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def truncate_result(result: Any, limit: int = 200) -> str:
+    """Stringify an agent result, truncated for readability"""
+    return str(result)[:limit]
+
+
+def request_key(query: str, config: Dict[str, Any]) -> tuple:
+    """Key on (thread_id, sha256(query)) so sessions never share answers"""
+    thread_id = config.get("configurable", {}).get("thread_id", "")
+    return thread_id, hashlib.sha256(query.encode("utf-8")).hexdigest()
+
 
 class ConcurrentAgentTester:
     """Test runner for concurrent agent execution scenarios"""
     
     def __init__(self):
-        self.results = []
+        self.results = deque()
         self.start_time = None
+        # In-flight agent calls keyed by request_key; entries are dropped on completion
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # Each task/thread logs into its own buffer; buffers are merged once at the end
+        self._results_buf = contextvars.ContextVar("results_buf")
+        self._buffers = []
+        self._buffers_lock = threading.Lock()
+        # Console output from worker coroutines, drained by one background task
+        self._log_q = None
+        self._log_task = None
+        # Durations of successful calls, packed for the summary statistics
+        self._durations = array("d")
+        # Records are streamed to disk as they are logged
+        self._log_file = open(RESULTS_LOG_FILE, "wb")
+        # Wall-clock anchor; records store a monotonic offset from it
+        self._wall_start = time.time()
+        self._mono_start_ns = time.perf_counter_ns()
+    
+    @staticmethod
+    def _current_owner():
+        """Identify the running asyncio task, or the thread outside an event loop"""
+        try:
+            return asyncio.current_task()
+        except RuntimeError:
+            return threading.get_ident()
+    
+    def _results_buffer(self) -> deque:
+        """Return the result buffer owned by the current task, creating it on first use"""
+        owner = self._current_owner()
+        entry = self._results_buf.get(None)
+        # Child tasks inherit the parent's context, so check ownership explicitly
+        if entry is None or entry[0] != owner:
+            entry = (owner, deque())
+            self._results_buf.set(entry)
+            with self._buffers_lock:
+                self._buffers.append(entry[1])
+        return entry[1]
+    
+    def emit(self, message: str):
+        """Queue a console line for the logger task, or print it directly if none is running"""
+        if self._log_q is None:
+            print(message)
+        else:
+            self._log_q.put_nowait(message)
+    
+    async def _drain_logs(self):
+        """Print queued console lines until the None sentinel arrives"""
+        while True:
+            message = await self._log_q.get()
+            if message is None:
+                break
+            print(message)
+    
+    def start_logger(self):
+        """Start the background console logger on the running loop"""
+        self._log_q = asyncio.Queue()
+        self._log_task = asyncio.ensure_future(self._drain_logs())
+    
+    async def stop_logger(self):
+        """Flush pending console lines and stop the logger task"""
+        if self._log_task is not None:
+            self._log_q.put_nowait(None)
+            await self._log_task
+            self._log_q = None
+            self._log_task = None
+    
+    def close(self):
+        """Close the streaming results log"""
+        if not self._log_file.closed:
+            self._log_file.close()
+    
+    def collect_results(self):
+        """Move buffered results into self.results"""
+        with self._buffers_lock:
+            for buf in self._buffers:
+                self.results.extend(buf)
+                buf.clear()
+    
+    async def warm_up(self):
+        """Issue one tiny request so the first real test doesn't pay connection setup"""
+        try:
+            await agent.ainvoke("ping", session_config("warmup"))
+        except Exception as e:
+            print(f"⚠️ Warm-up request failed: {e}")
+    
+    async def coalesced_ainvoke(self, query: str, config: Dict[str, Any], coalesce: bool = True):
+        """Invoke the agent; identical requests already in flight share one agent call"""
+        if not coalesce:
+            return await ainvoke_with_retry(query, config)
+        key = request_key(query, config)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(ainvoke_with_retry(query, config))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled waiter doesn't cancel the call for the others
+        return await asyncio.shield(task)
         
     def log_result(self, test_name: str, session_id: str, query: str, 
-                  result: Any, duration: float, error: str = None):
+                  result: Any, duration: float, error: str = None, queue_wait: float = None):
         """Log test results"""
-        self.results.append({
+        record = {
             "test_name": test_name,
             "session_id": session_id,
             "query": query,
-            "result": str(result)[:200] if result else None,  # Truncate for readability
+            "result": truncate_result(result) if result else None,
             "duration": duration,
+            "queue_wait": queue_wait,
             "error": error,
-            "timestamp": datetime.now().isoformat()
-        })
+            "offset_ns": time.perf_counter_ns() - self._mono_start_ns
+        }
+        self._results_buffer().append(record)
+        if not error:
+            self._durations.append(duration)
+        self._log_file.write(dumps_bytes(record) + b"\n")
+    
+    async def alog_result(self, test_name: str, session_id: str, query: str,
+                          result: Any, duration: float, error: str = None, queue_wait: float = None):
+        """Log test results, stringifying large agent states off the event loop"""
+        if result:
+            result = await asyncio.to_thread(truncate_result, result)
+        self.log_result(test_name, session_id, query, result, duration, error, queue_wait)
+    
+    def format_timestamp(self, offset_ns: int) -> str:
+        """Convert a record's monotonic offset to an ISO timestamp"""
+        return datetime.fromtimestamp(self._wall_start + offset_ns / 1e9).isoformat()
+    
+    def export_results(self) -> List[Dict[str, Any]]:
+        """Return collected results with ISO timestamps filled in"""
+        self.collect_results()
+        return [{**r, "timestamp": self.format_timestamp(r["offset_ns"])} for r in self.results]
     
     def print_results_summary(self):
         """Print a summary of all test results"""
+        self.collect_results()
         print("\n" + "="*80)
         print("CONCURRENT AGENT TEST RESULTS SUMMARY")
         print("="*80)
@@ -63,58 +259,68 @@ class ConcurrentAgentTester:
             print(f"\n{i}. {result['test_name']} - {result['session_id']}")
             print(f"   Status: {status}")
             print(f"   Query: {result['query']}")
+            print(f"   Time: {self.format_timestamp(result['offset_ns'])}")
             print(f"   Duration: {result['duration']:.2f}s")
+            if result.get("queue_wait") is not None:
+                print(f"   Queue wait: {result['queue_wait']:.2f}s")
             if result["error"]:
                 print(f"   Error: {result['error']}")
             else:
                 print(f"   Result: {result['result']}...")
         
         # Performance summary
-        successful_tests = [r for r in self.results if not r["error"]]
-        if successful_tests:
-            avg_duration = sum(r["duration"] for r in successful_tests) / len(successful_tests)
-            min_duration = min(r["duration"] for r in successful_tests)
-            max_duration = max(r["duration"] for r in successful_tests)
+        durations = self._durations
+        if durations:
+            avg_duration = sum(durations) / len(durations)
+            min_duration = min(durations)
+            max_duration = max(durations)
             
             print(f"\nPERFORMANCE SUMMARY:")
             print(f"Total tests: {len(self.results)}")
-            print(f"Successful: {len(successful_tests)}")
-            print(f"Failed: {len(self.results) - len(successful_tests)}")
+            print(f"Successful: {len(durations)}")
+            print(f"Failed: {len(self.results) - len(durations)}")
             print(f"Average duration: {avg_duration:.2f}s")
             print(f"Min duration: {min_duration:.2f}s")
             print(f"Max duration: {max_duration:.2f}s")
     
-    def test_sequential_different_sessions(self):
-        """Test 1: Sequential execution with different session IDs"""
-        print("\n🔄 TEST 1: Sequential execution with different session IDs")
-        
-        queries = [
-            "What is machine learning?",
-            "Explain neural networks",
-            "What is deep learning?",
-            "Tell me about data science"
-        ]
+    async def test_batched_different_sessions(self):
+        """Test 1: Independent sessions fanned out as one batch"""
+        self.emit("\n🔄 TEST 1: Batched execution with different session IDs")
         
-        for i, query in enumerate(queries):
-            session_id = f"session_{i+1}"
-            config = {"configurable": {"thread_id": session_id}}
-            
-            start_time = time.time()
+        async def run_session(session_id: str, query: str):
+            """Run one independent session"""
+            config = session_config(session_id)
+            start_time = time.perf_counter()
             try:
-                result = agent.invoke(query, config)
-                duration = time.time() - start_time
-                self.log_result("Sequential Different Sessions", session_id, query, result, duration)
-                print(f"  ✅ {session_id}: {duration:.2f}s - {query}")
+                result = await self.coalesced_ainvoke(query, config)
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Batched Different Sessions", session_id, query, result, duration)
+                self.emit(f"  ✅ {session_id}: {duration:.2f}s - {query}")
             except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Sequential Different Sessions", session_id, query, None, duration, str(e))
-                print(f"  ❌ {session_id}: {duration:.2f}s - Error: {e}")
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Batched Different Sessions", session_id, query, None, duration, str(e))
+                self.emit(f"  ❌ {session_id}: {duration:.2f}s - Error: {e}")
+        
+        async def run_batch():
+            queries = [
+                "What is machine learning?",
+                "Explain neural networks",
+                "What is deep learning?",
+                "Tell me about data science"
+            ]
+            
+            start_time = time.perf_counter()
+            await asyncio.gather(*(run_session(f"session_{i+1}", query) for i, query in enumerate(queries)))
+            total_time = time.perf_counter() - start_time
+            self.emit(f"  🕒 Total batched execution time: {total_time:.2f}s")
+        
+        await run_batch()
     
-    def test_sequential_same_session(self):
+    async def test_sequential_same_session(self):
         """Test 2: Sequential execution with same session ID (conversation memory)"""
-        print("\n🔄 TEST 2: Sequential execution with same session ID")
+        self.emit("\n🔄 TEST 2: Sequential execution with same session ID")
         
-        config = {"configurable": {"thread_id": "same_session"}}
+        config = session_config("same_session")
         
         queries = [
             "My name is Alice",
@@ -124,37 +330,35 @@ class ConcurrentAgentTester:
         ]
         
         for i, query in enumerate(queries):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
-                result = agent.invoke(query, config)
-                duration = time.time() - start_time
-                self.log_result("Sequential Same Session", "same_session", query, result, duration)
-                print(f"  ✅ Query {i+1}: {duration:.2f}s - {query}")
+                result = await self.coalesced_ainvoke(query, config)
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Sequential Same Session", "same_session", query, result, duration)
+                self.emit(f"  ✅ Query {i+1}: {duration:.2f}s - {query}")
             except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Sequential Same Session", "same_session", query, None, duration, str(e))
-                print(f"  ❌ Query {i+1}: {duration:.2f}s - Error: {e}")
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Sequential Same Session", "same_session", query, None, duration, str(e))
+                self.emit(f"  ❌ Query {i+1}: {duration:.2f}s - Error: {e}")
     
-    def test_concurrent_different_sessions(self):
+    async def test_concurrent_different_sessions(self):
         """Test 3: Concurrent execution with different session IDs"""
-        print("\n🔄 TEST 3: Concurrent execution with different session IDs")
+        self.emit("\n🔄 TEST 3: Concurrent execution with different session IDs")
         
         async def run_agent_async(session_id: str, query: str):
             """Async wrapper for agent execution"""
-            config = {"configurable": {"thread_id": session_id}}
-            start_time = time.time()
+            config = session_config(session_id)
+            start_time = time.perf_counter()
             try:
-                # Run agent in thread pool since it's not natively async
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(None, lambda: agent.invoke(query, config))
-                duration = time.time() - start_time
-                self.log_result("Concurrent Different Sessions", session_id, query, result, duration)
-                print(f"  ✅ {session_id}: {duration:.2f}s - {query}")
+                result = await self.coalesced_ainvoke(query, config)
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Concurrent Different Sessions", session_id, query, result, duration)
+                self.emit(f"  ✅ {session_id}: {duration:.2f}s - {query}")
                 return result
             except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Concurrent Different Sessions", session_id, query, None, duration, str(e))
-                print(f"  ❌ {session_id}: {duration:.2f}s - Error: {e}")
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Concurrent Different Sessions", session_id, query, None, duration, str(e))
+                self.emit(f"  ❌ {session_id}: {duration:.2f}s - Error: {e}")
                 return None
         
         async def run_concurrent_test():
@@ -166,110 +370,136 @@ class ConcurrentAgentTester:
             ]
             
             tasks = [run_agent_async(session_id, query) for session_id, query in queries]
-            start_time = time.time()
+            start_time = time.perf_counter()
             results = await asyncio.gather(*tasks, return_exceptions=True)
-            total_time = time.time() - start_time
-            print(f"  🕒 Total concurrent execution time: {total_time:.2f}s")
+            total_time = time.perf_counter() - start_time
+            self.emit(f"  🕒 Total concurrent execution time: {total_time:.2f}s")
             return results
         
-        asyncio.run(run_concurrent_test())
+        await run_concurrent_test()
     
-    def test_concurrent_same_session(self):
-        """Test 4: Concurrent execution with same session ID (potential conflicts)"""
-        print("\n🔄 TEST 4: Concurrent execution with same session ID")
-        
-        def run_agent_sync(query: str, query_id: int):
-            """Synchronous wrapper for threading"""
-            config = {"configurable": {"thread_id": "shared_session"}}
-            start_time = time.time()
-            try:
-                result = agent.invoke(query, config)
-                duration = time.time() - start_time
-                self.log_result("Concurrent Same Session", "shared_session", query, result, duration)
-                print(f"  ✅ Query {query_id}: {duration:.2f}s - {query}")
-                return result
-            except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Concurrent Same Session", "shared_session", query, None, duration, str(e))
-                print(f"  ❌ Query {query_id}: {duration:.2f}s - Error: {e}")
-                return None
+    async def test_concurrent_same_session(self):
+        """Test 4: Concurrent requests for the same session ID, serialized through a queue"""
+        self.emit("\n🔄 TEST 4: Concurrent requests with same session ID (serialized queue)")
         
-        queries = [
-            "Tell me about Python",
-            "What is JavaScript?",
-            "Explain Java programming",
-            "What is C++ used for?"
-        ]
+        async def consume_queries(queue: asyncio.Queue, config: Dict[str, Any]):
+            """Single consumer: the checkpointer serializes same-thread calls anyway"""
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                query_id, query, enqueued_at = item
+                start_time = time.perf_counter()
+                queue_wait = start_time - enqueued_at
+                try:
+                    result = await self.coalesced_ainvoke(query, config)
+                    duration = time.perf_counter() - start_time
+                    await self.alog_result("Concurrent Same Session", "shared_session", query, result, duration,
+                                    queue_wait=queue_wait)
+                    self.emit(f"  ✅ Query {query_id}: {duration:.2f}s (queued {queue_wait:.2f}s) - {query}")
+                except Exception as e:
+                    duration = time.perf_counter() - start_time
+                    await self.alog_result("Concurrent Same Session", "shared_session", query, None, duration, str(e),
+                                    queue_wait=queue_wait)
+                    self.emit(f"  ❌ Query {query_id}: {duration:.2f}s (queued {queue_wait:.2f}s) - Error: {e}")
         
-        start_time = time.time()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [executor.submit(run_agent_sync, query, i+1) for i, query in enumerate(queries)]
-            results = [f.result() for f in concurrent.futures.as_completed(futures)]
+        async def run_serialized_test():
+            queries = [
+                "Tell me about Python",
+                "What is JavaScript?",
+                "Explain Java programming",
+                "What is C++ used for?"
+            ]
+            
+            config = session_config("shared_session")
+            queue = asyncio.Queue()
+            start_time = time.perf_counter()
+            for i, query in enumerate(queries):
+                queue.put_nowait((i + 1, query, start_time))
+            queue.put_nowait(None)
+            
+            await consume_queries(queue, config)
+            total_time = time.perf_counter() - start_time
+            self.emit(f"  🕒 Total serialized execution time: {total_time:.2f}s")
         
-        total_time = time.time() - start_time
-        print(f"  🕒 Total concurrent execution time: {total_time:.2f}s")
+        await run_serialized_test()
     
-    def test_stress_many_sessions(self, num_sessions: int = 10):
+    async def test_stress_many_sessions(self, num_sessions: int = 10, max_concurrency: int = MAX_CONCURRENCY):
         """Test 5: Stress test with many concurrent sessions"""
-        print(f"\n🔄 TEST 5: Stress test with {num_sessions} concurrent sessions")
+        self.emit(f"\n🔄 TEST 5: Stress test with {num_sessions} concurrent sessions (max {max_concurrency} in flight)")
         
-        async def run_stress_session(session_id: int):
-            """Single stress test session"""
-            config = {"configurable": {"thread_id": f"stress_session_{session_id}"}}
-            query = f"What is session {session_id} about?"
-            
-            start_time = time.time()
-            try:
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(None, lambda: agent.invoke(query, config))
-                duration = time.time() - start_time
-                self.log_result("Stress Test", f"stress_session_{session_id}", query, result, duration)
-                return session_id, True, duration
-            except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Stress Test", f"stress_session_{session_id}", query, None, duration, str(e))
-                return session_id, False, duration
+        gate = asyncio.Semaphore(max_concurrency)
+        
+        async def run_session(session_id: str, query: str) -> bool:
+            """Run one session under the concurrency gate, timing only its own call"""
+            async with gate:
+                start_time = time.perf_counter()
+                try:
+                    result = await self.coalesced_ainvoke(query, session_config(session_id))
+                except Exception as e:
+                    await self.alog_result("Stress Test", session_id, query, None, time.perf_counter() - start_time, str(e))
+                    return False
+                await self.alog_result("Stress Test", session_id, query, result, time.perf_counter() - start_time)
+                return True
         
         async def run_stress_test():
-            tasks = [run_stress_session(i) for i in range(num_sessions)]
-            start_time = time.time()
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            total_time = time.time() - start_time
+            queries = [f"What is session {i} about?" for i in range(num_sessions)]
+            start_time = time.perf_counter()
+            outcomes = await asyncio.gather(*(run_session(f"stress_session_{i}", query) for i, query in enumerate(queries)))
+            total_time = time.perf_counter() - start_time
             
-            successful = sum(1 for _, success, _ in results if success)
+            successful = sum(outcomes)
             failed = num_sessions - successful
-            avg_duration = sum(duration for _, _, duration in results) / num_sessions
             
-            print(f"  🕒 Total stress test time: {total_time:.2f}s")
-            print(f"  ✅ Successful sessions: {successful}/{num_sessions}")
-            print(f"  ❌ Failed sessions: {failed}/{num_sessions}")
-            print(f"  ⏱️ Average session duration: {avg_duration:.2f}s")
+            self.emit(f"  🕒 Total stress test time: {total_time:.2f}s")
+            self.emit(f"  ✅ Successful sessions: {successful}/{num_sessions}")
+            self.emit(f"  ❌ Failed sessions: {failed}/{num_sessions}")
+            self.emit(f"  ⏱️ Average time per session: {total_time / num_sessions:.2f}s")
         
-        asyncio.run(run_stress_test())
+        await run_stress_test()
     
-    def test_streaming_concurrent(self):
+    async def test_streaming_concurrent(self):
         """Test 6: Concurrent streaming execution"""
-        print("\n🔄 TEST 6: Concurrent streaming execution")
+        self.emit("\n🔄 TEST 6: Concurrent streaming execution")
+        
+        async def produce_chunks(query: str, config: Dict[str, Any], queue: asyncio.Queue):
+            """Read the stream as fast as it arrives; formatting happens in the consumer"""
+            try:
+                async for chunk in agent.astream(query, config):
+                    await queue.put(chunk)
+            finally:
+                await queue.put(None)
+        
+        async def consume_chunks(queue: asyncio.Queue, chunks: List[str]):
+            """Drain the queue and format chunks off the producer's path"""
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                chunks.append(str(chunk))
         
         async def run_streaming_session(session_id: str, query: str):
             """Single streaming session"""
-            config = {"configurable": {"thread_id": session_id}}
-            start_time = time.time()
+            config = session_config(session_id)
+            start_time = time.perf_counter()
             chunks = []
+            queue = asyncio.Queue(maxsize=64)
             
             try:
-                async for chunk in agent.astream(query, config):
-                    chunks.append(str(chunk))
+                await asyncio.gather(
+                    produce_chunks(query, config, queue),
+                    consume_chunks(queue, chunks)
+                )
                 
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 result = f"Streamed {len(chunks)} chunks"
-                self.log_result("Concurrent Streaming", session_id, query, result, duration)
-                print(f"  ✅ {session_id}: {duration:.2f}s - {len(chunks)} chunks")
+                await self.alog_result("Concurrent Streaming", session_id, query, result, duration)
+                self.emit(f"  ✅ {session_id}: {duration:.2f}s - {len(chunks)} chunks")
                 return chunks
             except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Concurrent Streaming", session_id, query, None, duration, str(e))
-                print(f"  ❌ {session_id}: {duration:.2f}s - Error: {e}")
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Concurrent Streaming", session_id, query, None, duration, str(e))
+                self.emit(f"  ❌ {session_id}: {duration:.2f}s - Error: {e}")
                 return None
         
         async def run_concurrent_streaming():
@@ -280,20 +510,20 @@ class ConcurrentAgentTester:
             ]
             
             tasks = [run_streaming_session(session_id, query) for session_id, query in queries]
-            start_time = time.time()
+            start_time = time.perf_counter()
             results = await asyncio.gather(*tasks, return_exceptions=True)
-            total_time = time.time() - start_time
-            print(f"  🕒 Total concurrent streaming time: {total_time:.2f}s")
+            total_time = time.perf_counter() - start_time
+            self.emit(f"  🕒 Total concurrent streaming time: {total_time:.2f}s")
         
-        asyncio.run(run_concurrent_streaming())
+        await run_concurrent_streaming()
     
-    def test_resource_isolation(self):
+    async def test_resource_isolation(self):
         """Test 7: Resource isolation between sessions"""
-        print("\n🔄 TEST 7: Resource isolation between sessions")
+        self.emit("\n🔄 TEST 7: Resource isolation between sessions")
         
         # Session A: Set some context
-        config_a = {"configurable": {"thread_id": "isolation_test_a"}}
-        config_b = {"configurable": {"thread_id": "isolation_test_b"}}
+        config_a = session_config("isolation_test_a")
+        config_b = session_config("isolation_test_b")
         
         queries_a = [
             "My favorite color is blue",
@@ -305,28 +535,27 @@ class ConcurrentAgentTester:
             "Remember that I work at DataInc"
         ]
         
-        # Set context in both sessions
-        print("  Setting context in session A...")
-        for query in queries_a:
-            start_time = time.time()
-            try:
-                result = agent.invoke(query, config_a)
-                duration = time.time() - start_time
-                self.log_result("Resource Isolation A", "isolation_test_a", query, result, duration)
-            except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Resource Isolation A", "isolation_test_a", query, None, duration, str(e))
+        async def set_context(test_name: str, session_id: str, config: Dict[str, Any], queries: List[str]):
+            """Set context within one session; its queries stay in order"""
+            for query in queries:
+                start_time = time.perf_counter()
+                try:
+                    result = await self.coalesced_ainvoke(query, config, coalesce=False)
+                    duration = time.perf_counter() - start_time
+                    await self.alog_result(test_name, session_id, query, result, duration)
+                except Exception as e:
+                    duration = time.perf_counter() - start_time
+                    await self.alog_result(test_name, session_id, query, None, duration, str(e))
         
-        print("  Setting context in session B...")
-        for query in queries_b:
-            start_time = time.time()
-            try:
-                result = agent.invoke(query, config_b)
-                duration = time.time() - start_time
-                self.log_result("Resource Isolation B", "isolation_test_b", query, result, duration)
-            except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Resource Isolation B", "isolation_test_b", query, None, duration, str(e))
+        async def set_context_in_both_sessions():
+            await asyncio.gather(
+                set_context("Resource Isolation A", "isolation_test_a", config_a, queries_a),
+                set_context("Resource Isolation B", "isolation_test_b", config_b, queries_b)
+            )
+        
+        # Set context in both sessions concurrently; probing starts once both are done
+        self.emit("  Setting context in sessions A and B...")
+        await set_context_in_both_sessions()
         
         # Test isolation
         isolation_queries = [
@@ -334,61 +563,96 @@ class ConcurrentAgentTester:
             "Where do I work?"
         ]
         
-        print("  Testing isolation...")
+        self.emit("  Testing isolation...")
         for query in isolation_queries:
             # Test session A
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
-                result_a = agent.invoke(query, config_a)
-                duration = time.time() - start_time
-                self.log_result("Isolation Test A", "isolation_test_a", query, result_a, duration)
-                print(f"    Session A - {query}: {str(result_a.get('message', ''))[:50]}...")
+                result_a = await self.coalesced_ainvoke(query, config_a, coalesce=False)
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Isolation Test A", "isolation_test_a", query, result_a, duration)
+                self.emit(f"    Session A - {query}: {str(result_a.get('message', ''))[:50]}...")
             except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Isolation Test A", "isolation_test_a", query, None, duration, str(e))
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Isolation Test A", "isolation_test_a", query, None, duration, str(e))
             
             # Test session B
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
-                result_b = agent.invoke(query, config_b)
-                duration = time.time() - start_time
-                self.log_result("Isolation Test B", "isolation_test_b", query, result_b, duration)
-                print(f"    Session B - {query}: {str(result_b.get('message', ''))[:50]}...")
+                result_b = await self.coalesced_ainvoke(query, config_b, coalesce=False)
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Isolation Test B", "isolation_test_b", query, result_b, duration)
+                self.emit(f"    Session B - {query}: {str(result_b.get('message', ''))[:50]}...")
             except Exception as e:
-                duration = time.time() - start_time
-                self.log_result("Isolation Test B", "isolation_test_b", query, None, duration, str(e))
+                duration = time.perf_counter() - start_time
+                await self.alog_result("Isolation Test B", "isolation_test_b", query, None, duration, str(e))
+
 
+def parse_args():
+    """Parse command line options for the test runner"""
+    parser = argparse.ArgumentParser(description="Concurrent LangGraph agent tests")
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        nargs="+",
+        default=[MAX_CONCURRENCY],
+        help="Concurrency limit(s) for the stress test, e.g. --max-concurrency 2 4 8 16"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="Threads in the default executor used by asyncio.to_thread (search tools, result truncation)"
+    )
+    return parser.parse_args()
 
-def main():
-    """Main test runner"""
+
+async def main():
+    """Main test runner; every test shares one event loop"""
+    args = parse_args()
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=args.max_workers, thread_name_prefix="to-thread")
+    )
     print("🚀 STARTING CONCURRENT LANGGRAPH AGENT TESTS")
     print("="*80)
     
     tester = ConcurrentAgentTester()
     
+    tester.start_logger()
     try:
-        # Run all tests
-        tester.test_sequential_different_sessions()
-        tester.test_sequential_same_session()
-        tester.test_concurrent_different_sessions()
-        tester.test_concurrent_same_session()
-        tester.test_stress_many_sessions(5)  # Start with 5 sessions
-        tester.test_streaming_concurrent()
-        tester.test_resource_isolation()
+        try:
+            await tester.warm_up()
+            
+            # Run all tests
+            await tester.test_batched_different_sessions()
+            await tester.test_sequential_same_session()
+            await tester.test_concurrent_different_sessions()
+            await tester.test_concurrent_same_session()
+            for max_concurrency in args.max_concurrency:
+                await tester.test_stress_many_sessions(5, max_concurrency)  # Start with 5 sessions
+            await tester.test_streaming_concurrent()
+            await tester.test_resource_isolation()
+        finally:
+            # Flush queued console lines before the summary or the error is printed
+            await tester.stop_logger()
         
         # Print comprehensive results
         tester.print_results_summary()
         
         # Save results to file
-        with open("concurrent_test_results.json", "w") as f:
-            json.dump(tester.results, f, indent=2)
-        print(f"\n💾 Results saved to concurrent_test_results.json")
+        with open(RESULTS_FILE, "wb") as f:
+            f.write(dumps_bytes(tester.export_results(), indent=True))
+        print(f"\n💾 Results saved to {RESULTS_FILE} (streamed log: {RESULTS_LOG_FILE})")
         
     except Exception as e:
         print(f"\n❌ Test execution failed: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        tester.close()
 
 
 if __name__ == "__main__":
-    main()
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(main())
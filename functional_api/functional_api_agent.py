@@ -12,106 +12,223 @@ A minimal, runnable template that uses your existing tools and llm_client.
 """
 
 import asyncio
+import functools
+import hashlib
+import json
 import os
-from typing import Any, Dict
-
-# Load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    print("✅ Loaded environment variables from .env file")
-except ImportError:
-    print("⚠️ python-dotenv not installed. Install with: pip install python-dotenv")
-except Exception as e:
-    print(f"⚠️ Could not load .env file: {e}")
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from langgraph.func import entrypoint, task
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.config import get_config
 from langgraph.types import StreamWriter
 
 from tools import AVAILABLE_TOOLS, execute_tool
 
-# Use your existing LLM client with environment variables from .env file
-from llm_client import create_conversation_llm
-llm = create_conversation_llm(temperature=0.2)
-print("✅ Using Azure OpenAI LLM")
 
-# Import the React agent from the other file
-from langgraph_react_agent import create_agent
-react_agent = create_agent()
-print("✅ LangGraph React agent loaded")
+@functools.lru_cache(maxsize=None)
+def get_llm():
+    """Conversation LLM, using your existing LLM client with environment variables from .env file."""
+    from llm_client import create_conversation_llm
+    return create_conversation_llm(temperature=0.2)
+
+
+@functools.lru_cache(maxsize=None)
+def get_json_llm():
+    """JSON-mode LLM for the fused detect + translate call."""
+    from llm_client import create_json_mode_llm
+    return create_json_mode_llm(temperature=0.2)
+
+
+@functools.lru_cache(maxsize=None)
+def get_react_agent():
+    """React agent from langgraph_react_agent, built on first use."""
+    from langgraph_react_agent import create_agent
+    return create_agent()
+
 
 # Per-thread persistence config
 CONFIG = {"configurable": {"thread_id": "functional-template-thread"}}
 
 # Translation settings
 ENABLE_TRANSLATION = True  # Set to True to enable language detection and translation
-DETECTED_LANGUAGE = "en"  # Store the detected language of the original message
 
+# A thread's language is saved (and detection skipped from then on) only after this many
+# consecutive detections agree, each at or above the confidence threshold
+LANGUAGE_CONFIRMATIONS = 2
+LANGUAGE_CONFIDENCE_THRESHOLD = 0.8
 
-@task()
-def detect_and_translate_to_english(user_input: str) -> Dict[str, str]:
-    """Detect the language of the input and translate to English if needed."""
-    global DETECTED_LANGUAGE
-    
-    # First, detect the language
-    detect_prompt = f"""Detect the language of the following text and respond with only the language code (e.g., 'en', 'hu', 'es', 'fr', 'de', etc.):
+# Translation cache keyed by (kind, sha1 of text, target language); greetings and
+# repeated prompts come up constantly, so identical inputs skip the LLM. The kind
+# keeps plain translations apart from fused detect+translate results
+TRANSLATION_CACHE_SIZE = 4096
+_TRANSLATION_CACHE: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+_TRANSLATION_CACHE_LOCK = threading.Lock()
 
-Text: {user_input}
 
-Language code:"""
+async def _translate_cached(kind: str, text: str, target: str, translate: Callable[[], Awaitable[Any]]) -> Any:
+    """Return a cached result of translate for text, computing it on a miss.
     
-    detected_lang = llm.invoke(detect_prompt).content.strip().lower()
-    DETECTED_LANGUAGE = detected_lang
+    Only values translate returns are stored; if it raises, nothing is cached.
+    """
+    key = (kind, hashlib.sha1(text.encode()).hexdigest(), target)
+    with _TRANSLATION_CACHE_LOCK:
+        if key in _TRANSLATION_CACHE:
+            _TRANSLATION_CACHE.move_to_end(key)
+            return _TRANSLATION_CACHE[key]
     
-    # If already English, return as is
-    if detected_lang in ['en', 'english']:
+    value = await translate()
+    with _TRANSLATION_CACHE_LOCK:
+        _TRANSLATION_CACHE[key] = value
+        if len(_TRANSLATION_CACHE) > TRANSLATION_CACHE_SIZE:
+            _TRANSLATION_CACHE.popitem(last=False)
+    return value
+
+
+def _parse_json_response(text: str) -> Dict[str, Any]:
+    """Parse a JSON object from an LLM response, tolerating markdown code fences."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[len("json"):]
+    return json.loads(text)
+
+
+async def _ainvoke_text(model: Any, prompt: str) -> str:
+    """Invoke an LLM asynchronously and return the stripped text content."""
+    return (await model.ainvoke(prompt)).content.strip()
+
+
+@task()
+async def detect_and_translate_to_english(user_input: str, known_language: Optional[str] = None) -> Dict[str, str]:
+    """Detect the language of the input and translate to English if needed, in one LLM call.
+    
+    When the thread's language is already known, detection is skipped.
+    """
+    if known_language in ['en', 'english']:
         return {
             "original_language": "en",
             "translated_input": user_input,
             "needs_translation": False
         }
-    
-    # Translate to English
-    translate_prompt = f"""Translate the following text to English. Only return the English translation, nothing else.
+    if known_language:
+        translate_prompt = f"""Translate the following text to English. Only return the English translation, nothing else.
 
-Original text ({detected_lang}): {user_input}
+Original text ({known_language}): {user_input}
 
 English translation:"""
+        translated_text = await _translate_cached(
+            "translate", user_input, "en", lambda: _ainvoke_text(get_llm(), translate_prompt)
+        )
+        return {
+            "original_language": known_language,
+            "translated_input": translated_text,
+            "needs_translation": True
+        }
+    
+    prompt = f"""Detect the language of the following text and translate it to English.
+Respond with a JSON object with three keys:
+- "lang": the language code (e.g., 'en', 'hu', 'es', 'fr', 'de', etc.)
+- "confidence": how sure you are of the language, from 0 to 1 (short or ambiguous text should score low)
+- "translation": the English translation, or an empty string if the text is already English
+
+Text: {user_input}"""
+    
+    async def detect() -> Tuple[str, float, str]:
+        # Parse before returning so a malformed reply raises and is never cached
+        parsed = _parse_json_response(await _ainvoke_text(get_json_llm(), prompt))
+        if not isinstance(parsed, dict) or not str(parsed.get("lang") or "").strip():
+            raise ValueError(f"unexpected detection response: {parsed!r}")
+        try:
+            confidence = min(max(float(parsed.get("confidence", 0)), 0.0), 1.0)
+        except (TypeError, ValueError):
+            confidence = 0.0
+        return str(parsed["lang"]).strip().lower(), confidence, str(parsed.get("translation") or "").strip()
+    
+    try:
+        detected_lang, confidence, translated_text = await _translate_cached("detect", user_input, "en", detect)
+    except Exception as e:
+        print(f"⚠️ Language detection failed, continuing untranslated: {e}")
+        # Not a detection: the caller must not save "en" as the thread's language
+        return {
+            "original_language": "en",
+            "translated_input": user_input,
+            "needs_translation": False,
+            "language_detected": False
+        }
+    
+    # If already English, return as is
+    if detected_lang in ['en', 'english']:
+        return {
+            "original_language": "en",
+            "translated_input": user_input,
+            "needs_translation": False,
+            "confidence": confidence
+        }
     
-    translated_text = llm.invoke(translate_prompt).content.strip()
+    # Non-English but nothing came back to translate: continue untranslated, and do not
+    # count it as a detection of either language
+    if not translated_text:
+        return {
+            "original_language": "en",
+            "translated_input": user_input,
+            "needs_translation": False,
+            "language_detected": False
+        }
     
     return {
         "original_language": detected_lang,
         "translated_input": translated_text,
-        "needs_translation": True
+        "needs_translation": True,
+        "confidence": confidence
     }
 
 
+def _react_thread_id(user_input: str) -> str:
+    """Derive the React agent thread_id from the outer run's thread."""
+    try:
+        parent_thread = get_config().get("configurable", {}).get("thread_id")
+    except RuntimeError:
+        parent_thread = None
+    if parent_thread:
+        return f"react-{parent_thread}"
+    return f"react-{hashlib.blake2b(user_input.encode(), digest_size=4).hexdigest()}"
+
+
 @task()
-def react_agent_task(user_input: str) -> Dict[str, Any]:
+async def react_agent_task(user_input: str) -> Dict[str, Any]:
     """Use the LangGraph React agent to handle the user input with RAG and web search capabilities."""
     print(f"🤖 [REACT AGENT] Processing: {user_input}")
     
-    # Get the current thread_id from the context (this should be passed automatically)
-    # For now, use a unique thread_id based on the input to ensure isolation
-    import hashlib
-    thread_id = f"react-{hashlib.md5(user_input.encode()).hexdigest()[:8]}"
+    # Share the parent thread so the React agent keeps conversation continuity;
+    # fall back to a short input hash when run outside a configured thread
+    thread_id = _react_thread_id(user_input)
     config = {"configurable": {"thread_id": thread_id}}
     
-    response = react_agent.invoke({"messages": [{"role": "user", "content": user_input}]}, config)
+    response = await get_react_agent().ainvoke({"messages": [{"role": "user", "content": user_input}]}, config)
     
     # Extract the response content
     message_content = response['messages'][-1].content
     
-    # Check if any tools were used by looking at the response structure
-    # The React agent will have used tools internally if needed
-    tool_used = None
-    if "🔍 [RAG TOOL]" in str(response) or "🌐 [WEB SEARCH]" in str(response):
-        if "🔍 [RAG TOOL]" in str(response):
-            tool_used = "rag_search"
-        if "🌐 [WEB SEARCH]" in str(response):
-            tool_used = "web_search"
+    # Check which tools ran this turn from the ToolMessages after the latest user message
+    tools_called = set()
+    for msg in reversed(response['messages']):
+        msg_type = getattr(msg, 'type', None)
+        if msg_type == 'human':
+            break
+        if msg_type == 'tool':
+            tools_called.add(msg.name)
+    # Report every tool that ran, rather than letting web search mask RAG
+    tool_used = ", ".join(
+        label for names, label in (
+            (("rag_search_tool", "rag_search_batch_tool"), "rag_search"),
+            (("web_search_tool",), "web_search"),
+        )
+        if not tools_called.isdisjoint(names)
+    ) or None
     
     return {
         "message": message_content,
@@ -121,10 +238,8 @@ def react_agent_task(user_input: str) -> Dict[str, Any]:
 
 
 @task()
-def translate_response_to_original_language(english_response: str, original_language: str) -> str:
+async def translate_response_to_original_language(english_response: str, original_language: str) -> str:
     """Translate the English response back to the original language."""
-    global DETECTED_LANGUAGE
-    
     # If original language was English, return as is
     if original_language in ['en', 'english']:
         return english_response
@@ -136,36 +251,74 @@ English text: {english_response}
 
 {original_language} translation:"""
     
-    translated_response = llm.invoke(translate_prompt).content.strip()
+    translated_response = await _translate_cached(
+        "translate", english_response, original_language, lambda: _ainvoke_text(get_llm(), translate_prompt)
+    )
     return translated_response
 
 
-# Entrypoint: detect language -> translate to English -> react agent -> translate back
-@entrypoint(checkpointer=MemorySaver())
-def agent(user_input: str, writer: StreamWriter) -> Dict[str, Any]:
+async def _core(
+    user_input: str, previous: Optional[Dict[str, Any]], translate: bool
+) -> Any:
+    """Shared agent body; translate is fixed per compiled entrypoint."""
+    # The thread's language is checkpointed once enough detections agree, so later turns skip detection
+    state = previous or {}
+    known_language = state.get("detected_language")
+    language_votes = list(state.get("language_votes") or [])
+    
+    if not translate:
+        result = await react_agent_task(user_input)
+        return entrypoint.final(value=result, save=state)
+    
     # Step 1: Detect language and translate to English if needed
-    if ENABLE_TRANSLATION:
-        translation_result = detect_and_translate_to_english(user_input).result()
-        processing_input = translation_result["translated_input"]
-        original_language = translation_result["original_language"]
-    else:
-        processing_input = user_input
-        original_language = "en"
+    translation_result = await detect_and_translate_to_english(user_input, known_language)
+    processing_input = translation_result["translated_input"]
+    original_language = translation_result["original_language"]
     
     # Step 2: Use React agent with RAG and web search capabilities
-    result = react_agent_task(processing_input).result()
+    result = await react_agent_task(processing_input)
     
     # Step 3: Translate response back to original language if needed
-    if ENABLE_TRANSLATION and original_language != "en":
-        final_response = translate_response_to_original_language(
+    if original_language != "en":
+        final_response = await translate_response_to_original_language(
             result["message"], 
             original_language
-        ).result()
+        )
         result["message"] = final_response
     
-    return result
+    # Only confident detections vote; failed or low-confidence turns leave the votes as they are
+    if (
+        not known_language
+        and translation_result.get("language_detected", True)
+        and translation_result.get("confidence", 0.0) >= LANGUAGE_CONFIDENCE_THRESHOLD
+    ):
+        language_votes = (language_votes + [original_language])[-LANGUAGE_CONFIRMATIONS:]
+        if len(language_votes) == LANGUAGE_CONFIRMATIONS and len(set(language_votes)) == 1:
+            known_language = original_language
+    return entrypoint.final(
+        value=result, save={"detected_language": known_language, "language_votes": language_votes}
+    )
+
+
+# Entrypoint: detect language -> translate to English -> react agent -> translate back
+@entrypoint(checkpointer=MemorySaver())
+async def agent_translate(user_input: str, writer: StreamWriter, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return await _core(user_input, previous, translate=True)
+
+
+# Entrypoint: react agent only, for when translation is turned off
+@entrypoint(checkpointer=MemorySaver())
+async def agent_notranslate(user_input: str, writer: StreamWriter, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return await _core(user_input, previous, translate=False)
 
 
+def get_agent():
+    """Return the compiled entrypoint matching the current ENABLE_TRANSLATION setting."""
+    return agent_translate if ENABLE_TRANSLATION else agent_notranslate
+
+
+# Default entrypoint for importers, chosen from ENABLE_TRANSLATION at import time
+agent = get_agent()
 
 
 async def run_streaming_example(prompt: str):
@@ -173,10 +326,18 @@ async def run_streaming_example(prompt: str):
     print(f"User: {prompt}")
     print("Agent reasoning:")
     
-    async for chunk in agent.astream(prompt, CONFIG):
+    async for chunk in get_agent().astream(prompt, CONFIG):
         print(">", chunk)
 
 
+async def run_batch(prompts: List[str]) -> List[Dict[str, Any]]:
+    """Run several prompts concurrently, each on its own thread, and return results in order."""
+    return await asyncio.gather(*(
+        get_agent().ainvoke(prompt, {"configurable": {"thread_id": f"functional-batch-thread-{i}"}})
+        for i, prompt in enumerate(prompts)
+    ))
+
+
 async def interactive_chat():
     """Interactive chat interface"""
     global ENABLE_TRANSLATION
@@ -213,11 +374,11 @@ async def interactive_chat():
             
             if streaming_mode:
                 print("\nAgent:")
-                async for chunk in agent.astream(user_input, CONFIG):
+                async for chunk in get_agent().astream(user_input, CONFIG):
                     print(">", chunk)
             else:
                 print("\nAgent:")
-                response = agent.invoke(user_input, CONFIG)
+                response = await get_agent().ainvoke(user_input, CONFIG)
                 print(f"Response: {response['message']}")
                 if response.get('tool'):
                     print(f"Tool used: {response['tool']}")
@@ -229,8 +390,21 @@ async def interactive_chat():
             print(f"Error: {e}")
 
 
+def load_environment():
+    """Load environment variables from .env file (run from main, not at import)."""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+        print("✅ Loaded .env; Azure OpenAI LLM and LangGraph React agent load on first use")
+    except ImportError:
+        print("⚠️ python-dotenv not installed. Install with: pip install python-dotenv")
+    except Exception as e:
+        print(f"⚠️ Could not load .env file: {e}")
+
+
 def main():
     """Main function - choose between demo or interactive chat"""
+    load_environment()
     print("Choose mode:")
     print("1. Run demo examples")
     print("2. Interactive chat")
@@ -240,10 +414,12 @@ def main():
     if choice == "1":
         print("\n=== LangGraph Functional API Agent Demo ===\n")
         
-        # Example 1: Simple invoke
-        print("1. Simple invoke example:")
-        out = agent.invoke("Search for the latest news about LangGraph", CONFIG)
-        print("Response:", out)
+        # Example 1: Search and chat prompts submitted together
+        print("1. Batch invoke example (search + chat):")
+        batch_prompts = ["Search for the latest news about LangGraph", "Hello, how are you?"]
+        for prompt, out in zip(batch_prompts, asyncio.run(run_batch(batch_prompts))):
+            print(f"User: {prompt}")
+            print("Response:", out)
         print()
         
         # Example 2: Streaming (async)
@@ -251,12 +427,6 @@ def main():
         asyncio.run(run_streaming_example("What is LangGraph functional API?"))
         print()
         
-        # Example 3: Chat example
-        print("3. Chat example:")
-        chat_out = agent.invoke("Hello, how are you?", CONFIG)
-        print("Response:", chat_out)
-        print()
-        
         print("Demo completed!")
         
     elif choice == "2":
@@ -7,7 +7,9 @@ Functional API Dual-Source Agent
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import functools
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
 
 from langgraph.func import entrypoint, task
 from langgraph.checkpoint.memory import MemorySaver
@@ -16,9 +18,16 @@ from langgraph.types import StreamWriter
 from rag_setup import setup_rag, RAGSetup
 from tools import web_search_tool
 
-# Optional LLM for synthesis
-from llm_client import create_conversation_llm
-llm = create_conversation_llm(temperature=0.2)
+# Optional tokenizer for token-based snippet budgets
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Per-snippet budget for the synthesis prompt (chars are the fallback without tiktoken)
+SNIPPET_TOKENS = 150
+SNIPPET_CHARS = 350
 
 # Persistent RAG instance (lazy)
 _RAG_INSTANCE: Optional[RAGSetup] = None
@@ -62,38 +71,74 @@ def web_search_task(query: str, max_results: int = 5) -> Dict[str, Any]:
     return result
 
 
-def _synthesize_answer(user_query: str, rag_data: Dict[str, Any], web_data: Dict[str, Any]) -> str:
+@functools.lru_cache(maxsize=None)
+def get_llm():
+    """LLM for synthesis, built on first use."""
+    from llm_client import create_conversation_llm
+    return create_conversation_llm(temperature=0.2)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding():
+    """Load the gpt-4o tokenizer once."""
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+def _truncate(text: str, n_tok: int = SNIPPET_TOKENS) -> str:
+    """Cap a snippet by tokens rather than characters."""
+    if not TIKTOKEN_AVAILABLE:
+        return text[:SNIPPET_CHARS]
+    encoding = _get_encoding()
+    return encoding.decode(encoding.encode(text[:n_tok * 8])[:n_tok])
+
+
+def _dedupe(snippets: Iterable[str], seen: set) -> List[str]:
+    """Drop snippets whose normalized opening matches one already used."""
+    unique = []
+    for snippet in snippets:
+        key = hash(" ".join(snippet[:200].lower().split()))
+        if snippet and key not in seen:
+            seen.add(key)
+            unique.append(snippet)
+    return unique
+
+
+async def _synthesize_answer(
+    user_query: str, rag_data: Dict[str, Any], web_data: Dict[str, Any], writer: Optional[StreamWriter] = None
+) -> str:
     print(f"🔄 SYNTHESIS: RAG success={rag_data.get('success')}, Web success={web_data.get('success')}")
     
-    rag_bits: List[str] = []
-    try:
-        rag_results = rag_data.get("data", {}).get("results") or []
-        print(f"🔄 SYNTHESIS: RAG has {len(rag_results)} results")
-        for r in rag_results[:5]:
-            snippet = r.get("text") or ""
-            rag_bits.append(snippet[:350])
-    except Exception as e:
-        print(f"❌ SYNTHESIS: RAG processing error: {e}")
-
-    web_bits: List[str] = []
-    try:
-        web_results = web_data.get("data", {}).get("results") or []
-        print(f"🔄 SYNTHESIS: Web has {len(web_results)} results")
-        for r in web_results[:5]:
-            piece = (r.get("title") or "") + " - " + (r.get("snippet") or "")
-            web_bits.append(piece[:350])
-    except Exception as e:
-        print(f"❌ SYNTHESIS: Web processing error: {e}")
+    rag_results = (rag_data.get("data") or {}).get("results") or []
+    web_results = (web_data.get("data") or {}).get("results") or []
+    print(f"🔄 SYNTHESIS: RAG has {len(rag_results)} results")
+    print(f"🔄 SYNTHESIS: Web has {len(web_results)} results")
+
+    # RAG and web often surface the same passage; keep only the first copy
+    seen: set = set()
+    rag_bits: List[str] = _dedupe((_truncate(r.get("text") or "") for r in islice(rag_results, 5)), seen)
+    web_bits: List[str] = _dedupe(
+        (_truncate((r.get("title") or "") + " - " + (r.get("snippet") or "")) for r in islice(web_results, 5)),
+        seen,
+    )
+    rag_context = "\n- ".join(rag_bits)
+    web_context = "\n- ".join(web_bits)
 
     prompt = (
         "You are a helpful assistant. Use the following RAG and Web Search context to answer the user.\n"
         "Cite sources inline with short markers like [RAG] or [WEB:n].\n\n"
         f"User question: {user_query}\n\n"
-        f"RAG context (max 5 chunks):\n- " + "\n- ".join(rag_bits) + "\n\n"
-        f"Web context (max 5 items):\n- " + "\n- ".join(web_bits) + "\n\n"
+        f"RAG context (max 5 chunks):\n- {rag_context}\n\n"
+        f"Web context (max 5 items):\n- {web_context}\n\n"
         "Answer concisely."
     )
-    return llm.invoke(prompt).content.strip()
+    # Stream tokens to the writer as they arrive and keep the full text for the result
+    parts: List[str] = []
+    async for chunk in get_llm().astream(prompt):
+        if chunk.content:
+            parts.append(chunk.content)
+            if writer is not None:
+                await _emit(writer, chunk.content)
+    return "".join(parts).strip()
 
 
 async def _emit(writer: StreamWriter, text: str) -> None:
@@ -126,11 +171,9 @@ async def dual_search_agent(user_input: str, writer: StreamWriter) -> Dict[str,
     await _emit(writer, "📚 Searching RAG database...\n")
     await _emit(writer, "🌐 Searching web...\n")
     
-    rag_future = rag_search_task(user_input)
-    web_future = web_search_task(user_input)
-    
-    # Wait for both to complete
-    rag_res, web_res = await asyncio.gather(rag_future, web_future)
+    # Start both tasks on the loop; LangGraph runs the sync task bodies in its
+    # executor, so the RAG lookup and the web search overlap
+    rag_res, web_res = await asyncio.gather(rag_search_task(user_input), web_search_task(user_input))
     
     # Stream results
     await _emit(writer, f"✅ RAG: {rag_res.get('message', 'No results')}\n")
@@ -138,11 +181,11 @@ async def dual_search_agent(user_input: str, writer: StreamWriter) -> Dict[str,
     
     # Synthesize final response
     await _emit(writer, "🔄 Synthesizing answer...\n")
-    answer = _synthesize_answer(user_input, rag_res, web_res)
     
-    # Stream final answer
+    # Stream final answer token by token
     await _emit(writer, "📝 Final Answer:\n")
-    await _emit(writer, f"{answer}\n")
+    answer = await _synthesize_answer(user_input, rag_res, web_res, writer)
+    await _emit(writer, "\n")
 
     return {
         "message": answer,
@@ -11,19 +11,29 @@ A news analysis agent that:
 6. Provides comprehensive feedback
 
 - Functional API (@entrypoint, @task)
-- PDF processing with PyPDF
+- PDF processing with pypdfium2 (pypdf fallback)
 - Language detection and question generation
 - Interrupt functionality for user interaction
 - Answer analysis and scoring
 """
 
 import asyncio
+import functools
+import hashlib
 import json
 import os
-import glob
-from typing import Any, Dict, List
+import re
+import signal
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
 from datetime import datetime
 
+from pydantic import BaseModel, Field, create_model
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -37,21 +47,453 @@ except Exception as e:
 from langgraph.func import entrypoint, task
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import StreamWriter, Command, interrupt
-from pypdf import PdfReader
 
-# Use your existing LLM client with environment variables from .env file
-from llm_client import create_conversation_llm
-llm = create_conversation_llm(temperature=0.3)
-print("✅ Using Azure OpenAI LLM")
+# Optional orjson for the prompt/response JSON hot paths; stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional tokenizer for token-based prompt budgets
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Optional fastText language identifier; the LLM is used when it is missing
+try:
+    from ftlangdetect import detect as fasttext_detect
+    FASTTEXT_AVAILABLE = True
+except ImportError:
+    FASTTEXT_AVAILABLE = False
+
+# Prefer the native PDFium engine for text extraction; fall back to pure-Python pypdf
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+
+# LLM clients are created on first use so the CLI starts without touching Azure
+@functools.lru_cache(maxsize=None)
+def _get_llm():
+    """Conversation LLM, using your existing LLM client with environment variables from .env file."""
+    from llm_client import create_conversation_llm
+    print("✅ Using Azure OpenAI LLM")
+    return create_conversation_llm(temperature=0.3)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_json_llm():
+    """JSON-mode LLM; guarantees syntactically valid JSON for the structured tasks."""
+    from llm_client import create_json_mode_llm
+    return create_json_mode_llm(temperature=0.3)
+
+
+def prewarm_llm():
+    """Open the pooled HTTPS connection with a one-token request, ignoring failures."""
+    try:
+        _get_llm().invoke("ping", max_tokens=1)
+    except Exception:
+        pass
+
+
+# On-disk cache for deterministic LLM calls (language detection, translation)
+CACHE_DIR = os.path.join("data", ".cache")
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite")
 
 # Per-thread persistence config
 CONFIG = {"configurable": {"thread_id": "news-analysis-thread"}}
 
-# Global variables for document analysis
-DOCUMENT_LANGUAGE = "en"
-DOCUMENT_TEXT = ""
-QUESTIONS = []
-USER_ANSWERS = []
+# Prompt budgets for document samples, in tokens (character budgets when tiktoken is missing)
+LANGUAGE_SAMPLE_TOKENS = 256
+LANGUAGE_SAMPLE_CHARS = 1000
+QUESTION_SAMPLE_TOKENS = 1500
+QUESTION_SAMPLE_CHARS = 4000
+
+# Below this fastText score the LLM double-checks the language
+LANGUAGE_CONFIDENCE_THRESHOLD = 0.6
+
+# Standalone page numbers and "Page x of y" lines left behind by PDF extraction
+PAGE_BOILERPLATE_RE = re.compile(r"^\s*(?:page\s+)?\d+(?:\s*(?:/|of)\s*\d+)?\s*$", re.IGNORECASE | re.MULTILINE)
+
+# Per-question score keys and the matching overall breakdown keys
+SCORE_BREAKDOWN_KEYS = {
+    "accuracy": "average_accuracy",
+    "completeness": "average_completeness",
+    "relevance": "average_relevance",
+    "language_quality": "average_language",
+    "critical_thinking": "average_critical_thinking",
+    "evidence_usage": "average_evidence_usage"
+}
+
+# Per-question score as soon as its value is complete in a streamed analysis
+STREAMED_SCORE_RE = re.compile(r'"question_number"\s*:\s*(\d+).*?"overall_score"\s*:\s*(\d+)\s*[,}\s]', re.DOTALL)
+
+# Below this page count, process start-up costs more than parallel extraction saves
+PARALLEL_PAGE_THRESHOLD = 4
+
+# Questions are generated in this language while detection is still running;
+# the speculative result is discarded if the document turns out to differ
+SPECULATIVE_LANGUAGE = "en"
+
+# Static labels of the summary report; other languages get a one-off, cached
+# translation so the finished report needs no separate translation
+REPORT_LABELS = {
+    "title": "COMPREHENSIVE READING COMPREHENSION ANALYSIS REPORT",
+    "overall_summary": "OVERALL PERFORMANCE SUMMARY",
+    "total_score": "Total Score",
+    "grade": "Grade",
+    "performance_level": "Performance Level",
+    "score_breakdown": "DETAILED SCORE BREAKDOWN",
+    "accuracy": "Accuracy",
+    "completeness": "Completeness",
+    "relevance": "Relevance",
+    "language_quality": "Language Quality",
+    "language": "Language",
+    "critical_thinking": "Critical Thinking",
+    "evidence_usage": "Evidence Usage",
+    "question_by_question": "QUESTION-BY-QUESTION ANALYSIS",
+    "question_heading": "QUESTION",
+    "question": "Question",
+    "your_answer": "Your Answer",
+    "expected_answer": "Expected Answer",
+    "scores": "SCORES",
+    "overall": "Overall",
+    "feedback": "FEEDBACK",
+    "strengths": "STRENGTHS",
+    "areas_for_improvement": "AREAS FOR IMPROVEMENT",
+    "suggestions": "SUGGESTIONS",
+    "key_points_missed": "KEY POINTS YOU MISSED",
+    "excellent_points": "EXCELLENT POINTS",
+    "overall_analysis": "OVERALL ANALYSIS",
+    "strengths_summary": "STRENGTHS SUMMARY",
+    "improvement_areas": "IMPROVEMENT AREAS",
+    "recommendations": "RECOMMENDATIONS",
+    "encouragement": "ENCOURAGEMENT",
+    "next_steps": "NEXT STEPS FOR IMPROVEMENT",
+    "step_1": "Review the detailed feedback for each question",
+    "step_2": "Focus on the identified improvement areas",
+    "step_3": "Practice with similar reading materials",
+    "step_4": "Pay attention to specific details and critical analysis",
+    "step_5": "Continue practicing to build confidence"
+}
+
+
+# Summary report templates, filled with str.format_map; "L" maps to the report labels
+REPORT_HEADER_TEMPLATE = """
+""" + "=" * 80 + """
+📊 {L[title]}
+""" + "=" * 80 + """
+
+🎯 {L[overall_summary]}
+""" + "-" * 50 + """
+📈 {L[total_score]}: {total_score}/100
+🏆 {L[grade]}: {grade}
+📊 {L[performance_level]}: {performance_level}
+
+📋 {L[score_breakdown]}
+""" + "-" * 50
+
+REPORT_BREAKDOWN_TEMPLATE = """
+• {L[accuracy]}: {average_accuracy}/100
+• {L[completeness]}: {average_completeness}/100
+• {L[relevance]}: {average_relevance}/100
+• {L[language_quality]}: {average_language}/100
+• {L[critical_thinking]}: {average_critical_thinking}/100
+• {L[evidence_usage]}: {average_evidence_usage}/100"""
+
+REPORT_QUESTIONS_HEADER_TEMPLATE = """
+
+📝 {L[question_by_question]}
+""" + "-" * 50
+
+REPORT_QUESTION_TEMPLATE = """
+
+🔍 {L[question_heading]} {number}
+""" + "-" * 20 + """
+❓ {L[question]}: {question_text}
+💭 {L[your_answer]}: {user_answer}
+✅ {L[expected_answer]}: {correct_answer}
+
+📊 {L[scores]}:
+• {L[overall]}: {overall_score}/100 ({grade})
+• {L[accuracy]}: {accuracy}/100
+• {L[completeness]}: {completeness}/100
+• {L[relevance]}: {relevance}/100
+• {L[language]}: {language_quality}/100
+• {L[critical_thinking]}: {critical_thinking}/100
+• {L[evidence_usage]}: {evidence_usage}/100
+
+💡 {L[feedback]}:
+{detailed_feedback}
+
+✅ {L[strengths]}:
+{strengths}
+
+⚠️ {L[areas_for_improvement]}:
+{weaknesses}
+
+💡 {L[suggestions]}:
+{suggestions}
+
+🎯 {L[key_points_missed]}:
+{key_points_missed}
+
+⭐ {L[excellent_points]}:
+{excellent_points}"""
+
+REPORT_FOOTER_TEMPLATE = """
+
+🎯 {L[overall_analysis]}
+""" + "-" * 50 + """
+📈 {L[strengths_summary]}:
+{strengths_summary}
+
+⚠️ {L[improvement_areas]}:
+{improvement_areas}
+
+💡 {L[recommendations]}:
+{recommendations}
+
+🌟 {L[encouragement]}:
+{encouragement}
+
+""" + "=" * 80 + """
+📚 {L[next_steps]}
+""" + "-" * 50 + """
+1. {L[step_1]}
+2. {L[step_2]}
+3. {L[step_3]}
+4. {L[step_4]}
+5. {L[step_5]}
+
+""" + "=" * 80 + """
+"""
+
+
+def to_json(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string (non-ASCII kept as-is) for embedding in a prompt."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
+
+def cached_invoke(prompt: str, json_mode: bool = False, validate: Optional[Callable[[str], Any]] = None) -> str:
+    """Invoke the LLM, reusing the stored response for an identical prompt.
+    
+    If validate raises on the response, the error propagates and nothing is stored.
+    """
+    key = hashlib.sha256((("json:" if json_mode else "") + prompt).encode("utf-8")).hexdigest()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # A short-lived connection per call keeps this safe from concurrently running tasks
+    with closing(sqlite3.connect(LLM_CACHE_PATH)) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT)")
+        row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+    
+    response = (_get_json_llm() if json_mode else _get_llm()).invoke(prompt).content.strip()
+    if validate is not None:
+        validate(response)
+    
+    with closing(sqlite3.connect(LLM_CACHE_PATH)) as conn:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)", (key, response))
+    return response
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding():
+    """Load the gpt-4o tokenizer once."""
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+def sample_document(text: str, max_tokens: int, max_chars: int) -> str:
+    """Return the start of the document, capped by tokens rather than characters."""
+    text = PAGE_BOILERPLATE_RE.sub("", text)
+    if not TIKTOKEN_AVAILABLE:
+        return text[:max_chars]
+    # Only tokenize a generous prefix; no script needs more than 8 chars per token
+    encoding = _get_encoding()
+    return encoding.decode(encoding.encode(text[:max_tokens * 8])[:max_tokens])
+
+
+def stream_json_response(prompt: str, show_scores: bool = False) -> str:
+    """Stream a JSON-mode response, optionally printing per-question scores as they complete."""
+    parts = []
+    scan_pos = 0
+    for chunk in _get_json_llm().stream(prompt):
+        parts.append(chunk.content)
+        # Only rescan once a value may have been terminated
+        if show_scores and any(c in chunk.content for c in ",}\n"):
+            text = "".join(parts)
+            for match in STREAMED_SCORE_RE.finditer(text, scan_pos):
+                print(f"  📊 Question {match.group(1)} scored {match.group(2)}/100")
+                scan_pos = match.end()
+    return "".join(parts).strip()
+
+
+@functools.lru_cache(maxsize=32)
+def get_report_labels(language: str) -> Dict[str, str]:
+    """Return the report labels in the given language.
+    
+    Raises if they could not be translated; lru_cache does not keep exceptions, so a
+    transient failure is retried on the next call.
+    """
+    if is_english(language):
+        return REPORT_LABELS
+    
+    # The prompt is fixed per language, so cached_invoke makes this a one-time call;
+    # only a response with every label present is stored
+    prompt = f"""Translate the values of this JSON object to {language}. Keep the keys unchanged, keep the values short and do not add emojis. Respond with only the JSON object.
+
+{to_json(REPORT_LABELS, indent=True)}"""
+    response = cached_invoke(prompt, json_mode=True, validate=ReportLabels.model_validate_json)
+    return ReportLabels.model_validate_json(response).model_dump()
+
+
+def is_english(language: str) -> bool:
+    """Check whether a detected language code or name means English."""
+    return language.lower() in ['en', 'english']
+
+
+@dataclass
+class DocState:
+    """Per-run document state; the text itself stays on disk, referenced by its content hash."""
+    __slots__ = ("text_id", "language", "questions", "answers")
+    
+    text_id: str
+    language: str
+    questions: List[Dict[str, Any]]
+    answers: List[Dict[str, Any]]
+
+
+# Schemas for the LLM's JSON responses; validated straight from the raw JSON text
+Score = Union[int, float]
+
+
+class Question(BaseModel):
+    question: str
+    correct_answer: str
+    question_type: str = "factual"
+
+
+class QuestionSet(BaseModel):
+    questions: List[Question] = Field(min_length=1)
+
+
+class QuestionAnalysis(BaseModel):
+    question_number: int
+    question_text: Optional[str] = None
+    user_answer: Optional[str] = None
+    correct_answer: Optional[str] = None
+    scores: Dict[str, Score] = Field(default_factory=dict)
+    overall_score: Optional[Score] = None
+    grade: Optional[str] = None
+    detailed_feedback: Optional[str] = None
+    strengths: List[str] = Field(default_factory=list)
+    weaknesses: List[str] = Field(default_factory=list)
+    suggestions: List[str] = Field(default_factory=list)
+    key_points_missed: List[str] = Field(default_factory=list)
+    excellent_points: List[str] = Field(default_factory=list)
+
+
+class OverallAnalysis(BaseModel):
+    total_score: Optional[Score] = None
+    grade: Optional[str] = None
+    performance_level: Optional[str] = None
+    score_breakdown: Dict[str, Score] = Field(default_factory=dict)
+    strengths_summary: Optional[str] = None
+    improvement_areas: Optional[str] = None
+    recommendations: Optional[str] = None
+    encouragement: Optional[str] = None
+
+
+class Analysis(BaseModel):
+    question_analyses: List[QuestionAnalysis]
+    overall_analysis: OverallAnalysis
+
+
+# One required string per English report label
+ReportLabels = create_model("ReportLabels", **{key: (str, ...) for key in REPORT_LABELS})
+
+
+def store_document_text(text: str) -> str:
+    """Write the document text to a content-addressed blob and return its id."""
+    text_id = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    path = os.path.join(CACHE_DIR, f"doc_{text_id}.txt")
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text_id
+
+
+@functools.lru_cache(maxsize=4)
+def load_document_text(text_id: str) -> str:
+    """Read a stored document text by id."""
+    with open(os.path.join(CACHE_DIR, f"doc_{text_id}.txt"), encoding="utf-8") as f:
+        return f.read()
+
+
+def _extract_page_range(args: tuple) -> List[str]:
+    """Extract the text of pages [start, stop) in a worker process."""
+    pdf_path, start, stop = args
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return [pdf[i].get_textpage().get_text_range() for i in range(start, stop)]
+    finally:
+        pdf.close()
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """Extract the text of every page, joined by newlines."""
+    if PDFIUM_AVAILABLE:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page_count = len(pdf)
+            workers = min(os.cpu_count() or 1, page_count)
+            if page_count < PARALLEL_PAGE_THRESHOLD or workers < 2:
+                parts = [pdf[i].get_textpage().get_text_range() for i in range(page_count)]
+                return "\n".join(part for part in parts if part)
+        finally:
+            pdf.close()
+        
+        # One contiguous page range per worker, so each process opens the file once
+        step = -(-page_count // workers)
+        ranges = [(pdf_path, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            parts = [text for chunk in executor.map(_extract_page_range, ranges) for text in chunk]
+    else:
+        from pypdf import PdfReader
+        # Iterate the lazy page list once; indexing it re-parses pages
+        parts = [page.extract_text() for page in PdfReader(pdf_path, strict=False).pages]
+    # Skip blank pages so they don't leave runs of empty lines
+    return "\n".join(part for part in parts if part)
+
+
+@functools.lru_cache(maxsize=16)
+def _extract_cached(pdf_path: str, mtime_ns: int, size: int) -> str:
+    """Extract PDF text once per file version, persisting it across runs in the cache directory."""
+    version = f"{os.path.abspath(pdf_path)}:{mtime_ns}:{size}"
+    sidecar = os.path.join(CACHE_DIR, hashlib.sha1(version.encode("utf-8")).hexdigest() + ".txt")
+    try:
+        with open(sidecar, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    
+    text = extract_pdf_text(pdf_path).strip()
+    if text:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(sidecar, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
 
 
 @task()
@@ -59,13 +501,18 @@ def setup_data_directory() -> Dict[str, Any]:
     """Set up data directory and check for PDF files."""
     data_dir = "data"
     
-    # Create data directory if it doesn't exist
-    if not os.path.exists(data_dir):
+    # List the directory once, creating it if it doesn't exist
+    try:
+        with os.scandir(data_dir) as it:
+            entries = list(it)
+    except FileNotFoundError:
         os.makedirs(data_dir)
         print(f"📁 Created data directory: {data_dir}")
+        entries = []
     
-    # Find PDF files in data directory
-    pdf_files = glob.glob(os.path.join(data_dir, "*.pdf"))
+    # Find PDF files in data directory (case-insensitive extension)
+    pdf_entries = [e for e in entries if e.is_file() and e.name.lower().endswith(".pdf")]
+    pdf_files = [e.path for e in pdf_entries]
     
     if not pdf_files:
         return {
@@ -74,7 +521,10 @@ def setup_data_directory() -> Dict[str, Any]:
             "pdf_files": []
         }
     
-    print(f"📄 Found {len(pdf_files)} PDF file(s): {[os.path.basename(f) for f in pdf_files]}")
+    print(f"📄 Found {len(pdf_files)} PDF file(s): {[e.name for e in pdf_entries]}")
+    
+    # Warm the LLM connection pool while the PDF is extracted
+    threading.Thread(target=prewarm_llm, daemon=True).start()
     
     return {
         "success": True,
@@ -85,14 +535,12 @@ def setup_data_directory() -> Dict[str, Any]:
 
 @task()
 def process_pdf_document(pdf_files: List[str]) -> Dict[str, Any]:
-    """Extract text from the first PDF file found."""
-    global DOCUMENT_TEXT
-    
+    """Extract text from the first PDF file found; only its content hash enters the checkpoint."""
     if not pdf_files:
         return {
             "success": False,
             "message": "No PDF files available for processing",
-            "text": ""
+            "text_id": None
         }
     
     # Process the first PDF file
@@ -100,29 +548,23 @@ def process_pdf_document(pdf_files: List[str]) -> Dict[str, Any]:
     print(f"📖 Processing PDF: {os.path.basename(pdf_path)}")
     
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        
-        # Clean up text
-        text = text.strip()
+        # Reuse the extraction while the file's mtime and size are unchanged
+        st = os.stat(pdf_path)
+        text = _extract_cached(pdf_path, st.st_mtime_ns, st.st_size)
         
         if not text:
             return {
                 "success": False,
                 "message": "Could not extract text from PDF. The file might be image-based or corrupted.",
-                "text": ""
+                "text_id": None
             }
         
-        DOCUMENT_TEXT = text
         print(f"✅ Successfully extracted {len(text)} characters from PDF")
         
         return {
             "success": True,
             "message": f"Successfully processed PDF: {os.path.basename(pdf_path)}",
-            "text": text,
+            "text_id": store_document_text(text),
             "char_count": len(text)
         }
         
@@ -130,17 +572,28 @@ def process_pdf_document(pdf_files: List[str]) -> Dict[str, Any]:
         return {
             "success": False,
             "message": f"Error processing PDF: {str(e)}",
-            "text": ""
+            "text_id": None
         }
 
 
 @task()
-def detect_document_language(document_text: str) -> Dict[str, str]:
-    """Detect the language of the document."""
-    global DOCUMENT_LANGUAGE
+def detect_document_language(text_id: str) -> Dict[str, Any]:
+    """Detect the language of the document, locally when possible."""
+    document_text = load_document_text(text_id)
     
-    # Use first 1000 characters for language detection
-    sample_text = document_text[:1000]
+    # Use the first ~256 tokens for language detection
+    sample_text = sample_document(document_text, LANGUAGE_SAMPLE_TOKENS, LANGUAGE_SAMPLE_CHARS)
+    
+    if FASTTEXT_AVAILABLE:
+        # fastText predicts on a single line
+        result = fasttext_detect(sample_text.replace("\n", " "), low_memory=True)
+        if result["score"] >= LANGUAGE_CONFIDENCE_THRESHOLD:
+            print(f"🌍 Detected document language: {result['lang']}")
+            return {
+                "language": result["lang"],
+                "confidence": round(result["score"], 3),
+                "method": "fasttext"
+            }
     
     prompt = f"""Detect the language of the following text and respond with only the language code (e.g., 'en', 'hu', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'zh', 'ja', 'ko', etc.):
 
@@ -148,24 +601,24 @@ Text: {sample_text}
 
 Language code:"""
     
-    detected_lang = llm.invoke(prompt).content.strip().lower()
-    DOCUMENT_LANGUAGE = detected_lang
+    detected_lang = cached_invoke(prompt).lower()
     
     print(f"🌍 Detected document language: {detected_lang}")
     
     return {
         "language": detected_lang,
-        "confidence": "high"  # Could be enhanced with confidence scoring
+        "confidence": "high",  # Could be enhanced with confidence scoring
+        "method": "llm"
     }
 
 
 @task()
-def generate_reading_comprehension_questions(document_text: str, language: str) -> Dict[str, Any]:
+def generate_reading_comprehension_questions(text_id: str, language: str) -> Dict[str, Any]:
     """Generate 2 reading comprehension questions based on the document."""
-    global QUESTIONS
+    document_text = load_document_text(text_id)
     
-    # Use first 4000 characters for question generation
-    sample_text = document_text[:4000]
+    # Use the first ~1500 tokens for question generation
+    sample_text = sample_document(document_text, QUESTION_SAMPLE_TOKENS, QUESTION_SAMPLE_CHARS)
     
     prompt = f"""Based on the following news article text, generate exactly 2 reading comprehension questions that test understanding of key facts, main ideas, and important details. Generate the questions in {language}.
 
@@ -193,25 +646,23 @@ Requirements:
 
 Generate questions in {language}:"""
     
-    response = llm.invoke(prompt).content.strip()
+    response = stream_json_response(prompt)
     
     try:
-        # Try to parse JSON response
-        import json
-        questions_data = json.loads(response)
-        QUESTIONS = questions_data["questions"]
+        # Parse and validate the JSON response in one pass
+        questions = [q.model_dump() for q in QuestionSet.model_validate_json(response).questions]
         
-        print(f"❓ Generated {len(QUESTIONS)} reading comprehension questions in {language}")
+        print(f"❓ Generated {len(questions)} reading comprehension questions in {language}")
         
         return {
             "success": True,
-            "questions": QUESTIONS,
+            "questions": questions,
             "language": language
         }
         
     except Exception as e:
-        # Fallback: create simple questions if JSON parsing fails
-        print(f"⚠️ JSON parsing failed, creating fallback questions: {e}")
+        # Fallback: create simple questions if the response is not valid
+        print(f"⚠️ JSON validation failed, creating fallback questions: {e}")
         
         fallback_questions = [
             {
@@ -226,8 +677,6 @@ Generate questions in {language}:"""
             }
         ]
         
-        QUESTIONS = fallback_questions
-        
         return {
             "success": True,
             "questions": fallback_questions,
@@ -237,70 +686,46 @@ Generate questions in {language}:"""
 
 
 @task()
-def ask_question_1(questions: List[Dict[str, Any]], language: str) -> Dict[str, Any]:
-    """Ask first question with interrupt for user input."""
-    question_data = questions[0]
-    
+def ask_questions(questions: List[Dict[str, Any]], language: str) -> Dict[str, Any]:
+    """Ask each question with an interrupt for user input."""
     print(f"\n📝 Reading Comprehension Test (in {language})")
     print("=" * 50)
-    print(f"\nQuestion 1: {question_data['question']}")
-    print("-" * 30)
-    
-    # Use interrupt to pause for user input
-    user_answer = interrupt(f"Please answer question 1 in {language}: {question_data['question']}")
-    
-    answer_data = {
-        "question_number": 1,
-        "question": question_data['question'],
-        "user_answer": user_answer,
-        "correct_answer": question_data['correct_answer'],
-        "question_type": question_data['question_type']
-    }
-    
-    print(f"Your answer: {user_answer}")
-    
-    return {
-        "success": True,
-        "answer_1": answer_data,
-        "remaining_questions": questions[1:]
-    }
-
-@task()
-def ask_question_2(question_1_result: Dict[str, Any], language: str) -> Dict[str, Any]:
-    """Ask second question with interrupt for user input."""
-    questions = question_1_result["remaining_questions"]
-    question_data = questions[0]
-    
-    print(f"\nQuestion 2: {question_data['question']}")
-    print("-" * 30)
-    
-    # Use interrupt to pause for user input
-    user_answer = interrupt(f"Please answer question 2 in {language}: {question_data['question']}")
-    
-    answer_data = {
-        "question_number": 2,
-        "question": question_data['question'],
-        "user_answer": user_answer,
-        "correct_answer": question_data['correct_answer'],
-        "question_type": question_data['question_type']
-    }
     
-    print(f"Your answer: {user_answer}")
+    answers = []
+    for number, question_data in enumerate(questions, 1):
+        print(f"\nQuestion {number}: {question_data['question']}")
+        print("-" * 30)
+        
+        # Use interrupt to pause for user input; on resume, earlier answers are replayed
+        user_answer = interrupt(f"Please answer question {number} in {language}: {question_data['question']}")
+        
+        answers.append({
+            "question_number": number,
+            "question": question_data['question'],
+            "user_answer": user_answer,
+            "correct_answer": question_data['correct_answer'],
+            "question_type": question_data['question_type']
+        })
+        
+        print(f"Your answer: {user_answer}")
     print()
     
-    # Combine both answers
-    all_answers = [question_1_result["answer_1"], answer_data]
-    
     return {
         "success": True,
-        "answers": all_answers,
-        "total_questions": 2
+        "answers": answers,
+        "total_questions": len(answers)
     }
 
 
 @task()
-def analyze_user_answers(answers: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Analyze and score user answers with comprehensive evaluation."""
+def analyze_user_answers(answers: List[Dict[str, Any]], language: str = "en") -> Dict[str, Any]:
+    """Analyze and score user answers, writing the feedback in the given language."""
+    
+    localization_instructions = ""
+    if not is_english(language):
+        localization_instructions = f"""
+Write every free-text field (feedback, strengths, weaknesses, suggestions, points, summaries, recommendations, encouragement) in {language}.
+"""
     
     analysis_prompt = f"""You are an expert reading comprehension evaluator. Analyze these answers with detailed, comprehensive feedback.
 
@@ -313,8 +738,8 @@ For each answer, evaluate these criteria (0-100 scale):
 6. **Evidence Usage**: References to the text or logical reasoning
 
 Answers to analyze:
-{json.dumps(answers, indent=2, ensure_ascii=False)}
-
+{to_json(answers, indent=True)}
+{localization_instructions}
 Provide detailed analysis in JSON format:
 {{
     "question_analyses": [
@@ -360,17 +785,18 @@ Provide detailed analysis in JSON format:
     }}
 }}"""
     
-    response = llm.invoke(analysis_prompt).content.strip()
+    response = stream_json_response(analysis_prompt, show_scores=True)
     
     try:
-        analysis = json.loads(response)
+        # Unset fields stay absent so the report falls back to its placeholders
+        analysis = Analysis.model_validate_json(response).model_dump(exclude_unset=True)
         return {
             "success": True,
             "analysis": analysis
         }
     except Exception as e:
         # Fallback analysis
-        print(f"⚠️ JSON parsing failed for analysis: {e}")
+        print(f"⚠️ JSON validation failed for analysis: {e}")
         
         fallback_analysis = {
             "overall_analysis": {
@@ -427,7 +853,7 @@ Provide detailed analysis in JSON format:
 def translate_report(report: str, target_language: str) -> str:
     """Translate the report to the target language."""
     
-    if target_language.lower() in ['en', 'english']:
+    if is_english(target_language):
         return report  # No translation needed for English
     
     translation_prompt = f"""Translate the following comprehensive reading comprehension analysis report to {target_language}. 
@@ -445,120 +871,97 @@ def translate_report(report: str, target_language: str) -> str:
     Provide only the translated report without any additional commentary."""
     
     try:
-        response = llm.invoke(translation_prompt).content.strip()
+        response = cached_invoke(translation_prompt)
         return response
     except Exception as e:
         print(f"⚠️ Translation failed: {e}")
         return report  # Return original if translation fails
 
 
+def _bullets(items: List[str]) -> str:
+    """Render a list as bullet lines."""
+    return "\n".join(f"• {item}" for item in items)
+
+
+def _question_fields(number: int, q: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one question analysis into the fields used by REPORT_QUESTION_TEMPLATE."""
+    scores = q.get('scores', {})
+    return {
+        "number": number,
+        "question_text": q.get('question_text', 'N/A'),
+        "user_answer": q.get('user_answer', 'N/A'),
+        "correct_answer": q.get('correct_answer', 'N/A'),
+        "overall_score": q.get('overall_score', 'N/A'),
+        "grade": q.get('grade', 'N/A'),
+        "accuracy": scores.get('accuracy', 'N/A'),
+        "completeness": scores.get('completeness', 'N/A'),
+        "relevance": scores.get('relevance', 'N/A'),
+        "language_quality": scores.get('language_quality', 'N/A'),
+        "critical_thinking": scores.get('critical_thinking', 'N/A'),
+        "evidence_usage": scores.get('evidence_usage', 'N/A'),
+        "detailed_feedback": q.get('detailed_feedback', 'No detailed feedback available'),
+        "strengths": _bullets(q.get('strengths', [])),
+        "weaknesses": _bullets(q.get('weaknesses', [])),
+        "suggestions": _bullets(q.get('suggestions', [])),
+        "key_points_missed": _bullets(q.get('key_points_missed', [])),
+        "excellent_points": _bullets(q.get('excellent_points', []))
+    }
+
+
 @task()
-def generate_summary_report(analysis: Dict[str, Any], language: str) -> str:
+def localize_report_labels(language: str) -> Dict[str, Any]:
+    """Provide the summary report labels in the document language."""
+    try:
+        labels = get_report_labels(language)
+    except Exception as e:
+        print(f"⚠️ Label translation failed: {e}")
+        return {"success": False, "labels": None}
+    return {
+        "success": True,
+        "labels": labels
+    }
+
+
+@task()
+def generate_summary_report(analysis: Dict[str, Any], language: str, labels: Dict[str, str] = None) -> str:
     """Generate a comprehensive summary report of the reading comprehension analysis."""
     
+    # Localized labels override the English defaults
+    L = {**REPORT_LABELS, **(labels or {})}
+    
     # Extract key data for easier formatting
     overall = analysis.get('overall_analysis', {})
     questions = analysis.get('question_analyses', [])
     
-    # Create a detailed visual report
-    report = f"""
-{'='*80}
-📊 COMPREHENSIVE READING COMPREHENSION ANALYSIS REPORT
-{'='*80}
-
-🎯 OVERALL PERFORMANCE SUMMARY
-{'-'*50}
-📈 Total Score: {overall.get('total_score', 'N/A')}/100
-🏆 Grade: {overall.get('grade', 'N/A')}
-📊 Performance Level: {overall.get('performance_level', 'N/A')}
-
-📋 DETAILED SCORE BREAKDOWN
-{'-'*50}"""
+    # Assemble the report from precompiled templates and join once
+    parts = [REPORT_HEADER_TEMPLATE.format_map({
+        "L": L,
+        "total_score": overall.get('total_score', 'N/A'),
+        "grade": overall.get('grade', 'N/A'),
+        "performance_level": overall.get('performance_level', 'N/A')
+    })]
     
-    # Add score breakdown if available
     score_breakdown = overall.get('score_breakdown', {})
     if score_breakdown:
-        report += f"""
-• Accuracy: {score_breakdown.get('average_accuracy', 'N/A')}/100
-• Completeness: {score_breakdown.get('average_completeness', 'N/A')}/100
-• Relevance: {score_breakdown.get('average_relevance', 'N/A')}/100
-• Language Quality: {score_breakdown.get('average_language', 'N/A')}/100
-• Critical Thinking: {score_breakdown.get('average_critical_thinking', 'N/A')}/100
-• Evidence Usage: {score_breakdown.get('average_evidence_usage', 'N/A')}/100"""
-    
-    # Add question-by-question analysis
+        parts.append(REPORT_BREAKDOWN_TEMPLATE.format_map({
+            "L": L,
+            **{key: score_breakdown.get(key, 'N/A') for key in SCORE_BREAKDOWN_KEYS.values()}
+        }))
+    
     if questions:
-        report += f"""
-
-📝 QUESTION-BY-QUESTION ANALYSIS
-{'-'*50}"""
-        
+        parts.append(REPORT_QUESTIONS_HEADER_TEMPLATE.format_map({"L": L}))
         for i, q in enumerate(questions, 1):
-            report += f"""
-
-🔍 QUESTION {i}
-{'-'*20}
-❓ Question: {q.get('question_text', 'N/A')}
-💭 Your Answer: {q.get('user_answer', 'N/A')}
-✅ Expected Answer: {q.get('correct_answer', 'N/A')}
-
-📊 SCORES:
-• Overall: {q.get('overall_score', 'N/A')}/100 ({q.get('grade', 'N/A')})
-• Accuracy: {q.get('scores', {}).get('accuracy', 'N/A')}/100
-• Completeness: {q.get('scores', {}).get('completeness', 'N/A')}/100
-• Relevance: {q.get('scores', {}).get('relevance', 'N/A')}/100
-• Language: {q.get('scores', {}).get('language_quality', 'N/A')}/100
-• Critical Thinking: {q.get('scores', {}).get('critical_thinking', 'N/A')}/100
-• Evidence Usage: {q.get('scores', {}).get('evidence_usage', 'N/A')}/100
-
-💡 FEEDBACK:
-{q.get('detailed_feedback', 'No detailed feedback available')}
-
-✅ STRENGTHS:
-{chr(10).join([f"• {strength}" for strength in q.get('strengths', [])])}
-
-⚠️ AREAS FOR IMPROVEMENT:
-{chr(10).join([f"• {weakness}" for weakness in q.get('weaknesses', [])])}
-
-💡 SUGGESTIONS:
-{chr(10).join([f"• {suggestion}" for suggestion in q.get('suggestions', [])])}
-
-🎯 KEY POINTS YOU MISSED:
-{chr(10).join([f"• {point}" for point in q.get('key_points_missed', [])])}
-
-⭐ EXCELLENT POINTS:
-{chr(10).join([f"• {point}" for point in q.get('excellent_points', [])])}"""
+            parts.append(REPORT_QUESTION_TEMPLATE.format_map({"L": L, **_question_fields(i, q)}))
     
-    # Add overall analysis
-    report += f"""
-
-🎯 OVERALL ANALYSIS
-{'-'*50}
-📈 STRENGTHS SUMMARY:
-{overall.get('strengths_summary', 'No strengths summary available')}
-
-⚠️ IMPROVEMENT AREAS:
-{overall.get('improvement_areas', 'No improvement areas identified')}
-
-💡 RECOMMENDATIONS:
-{overall.get('recommendations', 'No specific recommendations available')}
-
-🌟 ENCOURAGEMENT:
-{overall.get('encouragement', 'Keep up the good work!')}
-
-{'='*80}
-📚 NEXT STEPS FOR IMPROVEMENT
-{'-'*50}
-1. Review the detailed feedback for each question
-2. Focus on the identified improvement areas
-3. Practice with similar reading materials
-4. Pay attention to specific details and critical analysis
-5. Continue practicing to build confidence
-
-{'='*80}
-"""
+    parts.append(REPORT_FOOTER_TEMPLATE.format_map({
+        "L": L,
+        "strengths_summary": overall.get('strengths_summary', 'No strengths summary available'),
+        "improvement_areas": overall.get('improvement_areas', 'No improvement areas identified'),
+        "recommendations": overall.get('recommendations', 'No specific recommendations available'),
+        "encouragement": overall.get('encouragement', 'Keep up the good work!')
+    }))
     
-    return report
+    return "".join(parts)
 
 
 # Main workflow: PDF processing -> language detection -> question generation -> interrupt -> answer analysis -> summary
@@ -587,15 +990,26 @@ def news_analysis_agent(input_data: Dict[str, Any] = None) -> Dict[str, Any]:
             "error": "PDF processing failed"
         }
     
-    # Step 3: Detect document language
-    language_result = detect_document_language(process_result["text"]).result()
-    document_language = language_result["language"]
+    doc = DocState(text_id=process_result["text_id"], language=SPECULATIVE_LANGUAGE, questions=[], answers=[])
     
-    # Step 4: Generate reading comprehension questions
-    questions_result = generate_reading_comprehension_questions(
-        process_result["text"], 
-        document_language
-        ).result()
+    # Steps 3-4: Detect document language while speculatively generating questions
+    language_future = detect_document_language(doc.text_id)
+    speculative_questions = generate_reading_comprehension_questions(
+        doc.text_id,
+        SPECULATIVE_LANGUAGE
+    )
+    doc.language = language_future.result()["language"]
+    
+    # Localize the report labels in the background while the questions are answered
+    labels_future = localize_report_labels(doc.language)
+    
+    if is_english(doc.language):
+        questions_result = speculative_questions.result()
+    else:
+        questions_result = generate_reading_comprehension_questions(
+            doc.text_id, 
+            doc.language
+            ).result()
     
     if not questions_result["success"]:
         return {
@@ -603,40 +1017,42 @@ def news_analysis_agent(input_data: Dict[str, Any] = None) -> Dict[str, Any]:
             "message": "Failed to generate questions",
             "error": "Question generation failed"
         }
+    doc.questions = questions_result["questions"]
     
     # Step 5: Ask questions using interrupt functionality
-    question_1_result = ask_question_1(
-        questions_result["questions"], 
-        document_language
-    ).result()
-    
-    answers_result = ask_question_2(
-        question_1_result,
-        document_language
+    answers_result = ask_questions(
+        doc.questions, 
+        doc.language
     ).result()
+    doc.answers = answers_result["answers"]
     
-    # Step 6: Analyze user answers
-    analysis_result = analyze_user_answers(answers_result["answers"]).result()
+    # Step 6: Analyze user answers (feedback comes back in the document language)
+    analysis_result = analyze_user_answers(doc.answers, doc.language).result()
     
-    # Step 7: Generate summary report
+    # Step 7: Generate summary report with labels in the document language
+    labels_result = labels_future.result()
     summary_report = generate_summary_report(
         analysis_result["analysis"], 
-        document_language
+        doc.language,
+        labels_result["labels"]
     ).result()
     
-    # Step 8: Translate report to document language
-    translated_report = translate_report(
-        summary_report, 
-        document_language
-    ).result()
+    # Step 8: Translate report to document language, only if its labels could not be localized
+    if labels_result["success"]:
+        translated_report = summary_report
+    else:
+        translated_report = translate_report(
+            summary_report, 
+            doc.language
+        ).result()
     
     # Return comprehensive results
     return {
         "success": True,
         "message": "News analysis and reading comprehension test completed successfully",
-        "document_language": document_language,
-        "questions": questions_result["questions"],
-        "user_answers": answers_result["answers"],
+        "document_language": doc.language,
+        "questions": doc.questions,
+        "user_answers": doc.answers,
         "analysis": analysis_result["analysis"],
         "summary_report": summary_report,
         "translated_report": translated_report,
@@ -644,6 +1060,58 @@ def news_analysis_agent(input_data: Dict[str, Any] = None) -> Dict[str, Any]:
     }
 
 
+async def run_news_analysis(config: Dict[str, Any], completion_message: str):
+    """Stream the workflow, answering each interrupt from the console until it completes."""
+    loop = asyncio.get_running_loop()
+    cancel = asyncio.current_task().cancel
+    
+    # Ctrl-C cancels the running stream instead of killing the interpreter mid-task
+    try:
+        loop.add_signal_handler(signal.SIGINT, cancel)
+        signal_handler_installed = True
+    except (NotImplementedError, RuntimeError):
+        signal_handler_installed = False  # e.g. Windows event loops
+    
+    try:
+        stream_input = {}
+        while stream_input is not None:
+            next_input = None
+            async for event in news_analysis_agent.astream(stream_input, config):
+                print("Event:", event)
+                print()
+                
+                # Check if this is an interrupt event
+                if isinstance(event, dict) and "__interrupt__" in event:
+                    interrupt_obj = event["__interrupt__"][0]
+                    print(f"🔄 Interrupt: {interrupt_obj.value}")
+                    
+                    # input() stays on the main thread: an executor thread left blocked in it
+                    # after a cancel would keep reading stdin. The stream is paused at the
+                    # interrupt, so blocking the loop here costs nothing; Ctrl-C raises
+                    # KeyboardInterrupt again while waiting
+                    if signal_handler_installed:
+                        loop.remove_signal_handler(signal.SIGINT)
+                    try:
+                        user_answer = input("Your answer: ").strip()
+                    except KeyboardInterrupt:
+                        raise asyncio.CancelledError from None
+                    finally:
+                        if signal_handler_installed:
+                            loop.add_signal_handler(signal.SIGINT, cancel)
+                    
+                    # Resume with the user's answer in a new stream
+                    print("🔄 Resuming with your answer...")
+                    next_input = Command(resume=user_answer)
+                    break
+            stream_input = next_input
+        print(completion_message)
+    except asyncio.CancelledError:
+        print("\n⏹️ News analysis cancelled")
+    finally:
+        if signal_handler_installed:
+            loop.remove_signal_handler(signal.SIGINT)
+
+
 async def interactive_news_analysis():
     """Interactive interface for news analysis."""
     print("=== News Analysis and Reading Comprehension Agent ===")
@@ -672,35 +1140,7 @@ async def interactive_news_analysis():
                 config = {"configurable": {"thread_id": "news-analysis-thread"}}
                 
                 try:
-                    # Handle multiple interrupts properly
-                    current_stream = news_analysis_agent.stream({}, config)
-                    
-                    while True:
-                        try:
-                            event = next(current_stream)
-                            print("Event:", event)
-                            print()
-                            
-                            # Check if this is an interrupt event
-                            if isinstance(event, dict) and "__interrupt__" in event:
-                                interrupt_obj = event["__interrupt__"][0]
-                                print(f"🔄 Interrupt: {interrupt_obj.value}")
-                                
-                                # Get user input for the interrupt
-                                user_answer = input("Your answer: ").strip()
-                                
-                                # Resume with the user's answer and continue the stream
-                                print("🔄 Resuming with your answer...")
-                                current_stream = news_analysis_agent.stream(Command(resume=user_answer), config)
-                                continue
-                            
-                        except StopIteration:
-                            print("✅ News analysis completed successfully!")
-                            break
-                        except Exception as e:
-                            print(f"❌ Error: {e}")
-                            break
-                    
+                    await run_news_analysis(config, "✅ News analysis completed successfully!")
                 except Exception as e:
                     print(f"❌ News analysis failed: {e}")
             else:
@@ -731,36 +1171,7 @@ def main():
         try:
             # Use streaming to handle interrupts properly
             config = {"configurable": {"thread_id": "quick-test-thread"}}
-            
-            # Handle multiple interrupts properly
-            current_stream = news_analysis_agent.stream({}, config)
-            
-            while True:
-                try:
-                    event = next(current_stream)
-                    print("Event:", event)
-                    print()
-                    
-                    # Check if this is an interrupt event
-                    if isinstance(event, dict) and "__interrupt__" in event:
-                        interrupt_obj = event["__interrupt__"][0]
-                        print(f"🔄 Interrupt: {interrupt_obj.value}")
-                        
-                        # Get user input for the interrupt
-                        user_answer = input("Your answer: ").strip()
-                        
-                        # Resume with the user's answer and continue the stream
-                        print("🔄 Resuming with your answer...")
-                        current_stream = news_analysis_agent.stream(Command(resume=user_answer), config)
-                        continue
-                    
-                except StopIteration:
-                    print("✅ News analysis completed!")
-                    break
-                except Exception as e:
-                    print(f"❌ Error: {e}")
-                    break
-                    
+            asyncio.run(run_news_analysis(config, "✅ News analysis completed!"))
         except Exception as e:
             print(f"❌ Error during analysis: {e}")
     else:
@@ -3,9 +3,12 @@ Google Sheets integration for the LangGraph agent.
 Provides functions to load the Google Sheets client and append data to sheets.
 """
 
+import functools
 import os
 import json
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 # Optional gspread dependency
@@ -19,13 +22,32 @@ except ImportError:
     Credentials = None
     GSPREAD_AVAILABLE = False
 
+# Optional fast JSON parser; the stdlib json module is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Standard credential locations, checked after GSPREAD_CREDENTIALS
+_CRED_CANDIDATES = (
+    "smart-mark-411015-e7b745e2077e.json",  # Default credentials file
+    os.path.expanduser("~/.config/gspread/credentials.json"),
+    os.path.expanduser("~/google_sheets_credentials.json"),
+)
+
+# Header rows change rarely; re-read them at most once per TTL
+HEADER_CACHE_TTL = 60.0
+_HEADER_CACHE: Dict[Tuple[int, str, str], Tuple[float, List[str]]] = {}
+_HEADER_CACHE_LOCK = threading.Lock()
+
 def load_gspread_client(credentials_path: Optional[str] = None) -> GspreadClient:
     """
     Load and authenticate Google Sheets client.
     
     Args:
         credentials_path: Path to Google service account credentials JSON file.
-                         If None, will try to use environment variables.
+                         If None, uses GSPREAD_CREDENTIALS, then standard locations.
     
     Returns:
         Authenticated gspread client
@@ -40,25 +62,18 @@ def load_gspread_client(credentials_path: Optional[str] = None) -> GspreadClient
             "gspread library not available. Install with: pip install gspread google-auth"
         )
     
-    # Try to find credentials
+    # Try to find credentials: explicit path, then env var, then common locations
+    credentials_path = (
+        credentials_path
+        or os.environ.get("GSPREAD_CREDENTIALS")
+        or next((path for path in _CRED_CANDIDATES if os.path.exists(path)), None)
+    )
     if not credentials_path:
-        # Look for credentials in common locations
-        possible_paths = [
-            "smart-mark-411015-e7b745e2077e.json",  # Default credentials file
-            os.path.expanduser("~/.config/gspread/credentials.json"),
-            os.path.expanduser("~/google_sheets_credentials.json"),
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                credentials_path = path
-                break
-        
-        if not credentials_path:
-            raise ValueError(
-                "No credentials path provided and no default credentials found. "
-                "Please set credentials_path in tool config or place credentials file in a standard location."
-            )
+        raise ValueError(
+            "No credentials path provided and no default credentials found. "
+            "Please set credentials_path in tool config, set GSPREAD_CREDENTIALS, "
+            "or place credentials file in a standard location."
+        )
     
     # Validate credentials file exists
     if not os.path.exists(credentials_path):
@@ -66,8 +81,12 @@ def load_gspread_client(credentials_path: Optional[str] = None) -> GspreadClient
     
     try:
         # Load credentials from JSON file
-        with open(credentials_path, 'r') as f:
-            creds_data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(credentials_path, 'rb') as f:
+                creds_data = orjson.loads(f.read())
+        else:
+            with open(credentials_path, 'r') as f:
+                creds_data = json.load(f)
         
         # Create credentials object
         credentials = Credentials.from_service_account_info(
@@ -87,6 +106,130 @@ def load_gspread_client(credentials_path: Optional[str] = None) -> GspreadClient
     except Exception as e:
         raise Exception(f"Failed to authenticate with Google Sheets: {e}")
 
+@functools.lru_cache(maxsize=32)
+def _get_worksheet(
+    client: GspreadClient,
+    spreadsheet_title: str,
+    worksheet_name: str,
+    create: bool = False
+):
+    """
+    Open a worksheet handle, cached per (client, spreadsheet, worksheet).
+    
+    With create=True, a missing spreadsheet or worksheet is created.
+    """
+    # Open or create spreadsheet
+    try:
+        spreadsheet = client.open(spreadsheet_title)
+    except gspread.SpreadsheetNotFound:
+        if not create:
+            raise
+        # Try to create the spreadsheet if it doesn't exist
+        try:
+            spreadsheet = client.create(spreadsheet_title)
+        except Exception as e:
+            raise Exception(f"Failed to create spreadsheet '{spreadsheet_title}': {e}")
+    
+    # Get or create worksheet
+    try:
+        return spreadsheet.worksheet(worksheet_name)
+    except gspread.WorksheetNotFound:
+        if not create:
+            raise
+        # Create worksheet if it doesn't exist
+        try:
+            return spreadsheet.add_worksheet(
+                title=worksheet_name,
+                rows=1000,
+                cols=26
+            )
+        except Exception as e:
+            raise Exception(f"Failed to create worksheet '{worksheet_name}': {e}")
+
+def _get_headers(client: GspreadClient, spreadsheet_title: str, worksheet_name: str, worksheet) -> List[str]:
+    """Return the worksheet's header row, re-reading it at most once per HEADER_CACHE_TTL."""
+    key = (id(client), spreadsheet_title, worksheet_name)
+    now = time.monotonic()
+    with _HEADER_CACHE_LOCK:
+        cached = _HEADER_CACHE.get(key)
+    if cached and now - cached[0] < HEADER_CACHE_TTL:
+        return cached[1]
+    
+    try:
+        headers = worksheet.row_values(1)
+    except Exception:
+        headers = []
+    # Only cache a real header row so a freshly created sheet gets its headers written
+    if headers:
+        _set_headers(client, spreadsheet_title, worksheet_name, headers)
+    return headers
+
+def _set_headers(client: GspreadClient, spreadsheet_title: str, worksheet_name: str, headers: List[str]) -> None:
+    """Record a known header row in the header cache."""
+    with _HEADER_CACHE_LOCK:
+        _HEADER_CACHE[(id(client), spreadsheet_title, worksheet_name)] = (time.monotonic(), headers)
+
+def _drop_headers(client: GspreadClient, spreadsheet_title: str, worksheet_name: str) -> None:
+    """Forget a cached header row, e.g. after its worksheet was deleted or renamed."""
+    with _HEADER_CACHE_LOCK:
+        _HEADER_CACHE.pop((id(client), spreadsheet_title, worksheet_name), None)
+
+def _append_rows(
+    client: GspreadClient,
+    config: Dict[str, Any],
+    data_list: List[Dict[str, Any]]
+) -> Tuple[str, str, List[str]]:
+    """
+    Append rows to the configured worksheet with a single append_rows call.
+    
+    Returns:
+        Tuple of (spreadsheet_title, worksheet_name, headers)
+    """
+    # Extract sheet configuration
+    sheet_config = config.get("sheet", {})
+    spreadsheet_title = sheet_config.get("spreadsheet_title")
+    worksheet_name = sheet_config.get("worksheet_name")
+    
+    if not spreadsheet_title:
+        raise ValueError("Missing spreadsheet_title in sheet configuration")
+    if not worksheet_name:
+        raise ValueError("Missing worksheet_name in sheet configuration")
+    
+    # A cached worksheet handle goes stale when the sheet is deleted or renamed; on an API
+    # error the handle and header caches are dropped and the append is retried once
+    for attempt in range(2):
+        worksheet = _get_worksheet(client, spreadsheet_title, worksheet_name, create=True)
+        
+        # Prepare data for insertion
+        # Get existing headers to determine column order
+        headers = _get_headers(client, spreadsheet_title, worksheet_name, worksheet)
+        
+        # If no headers exist, create them from the data (in first-seen key order)
+        # and send them in the same request as the rows
+        rows_2d = []
+        if not headers:
+            headers = list(dict.fromkeys(key for data in data_list for key in data))
+            rows_2d.append(headers)
+        
+        # Create row data in the correct order; None and missing fields become empty cells
+        rows_2d.extend(
+            ["" if data.get(header) is None else str(data[header]) for header in headers]
+            for data in data_list
+        )
+        
+        # Append every row in one API call
+        try:
+            worksheet.append_rows(rows_2d, value_input_option="RAW")
+            break
+        except (gspread.exceptions.APIError, gspread.WorksheetNotFound):
+            if attempt:
+                raise
+            _get_worksheet.cache_clear()
+            _drop_headers(client, spreadsheet_title, worksheet_name)
+    
+    _set_headers(client, spreadsheet_title, worksheet_name, headers)
+    return spreadsheet_title, worksheet_name, headers
+
 def append_to_sheet(
     client: GspreadClient, 
     config: Dict[str, Any], 
@@ -108,66 +251,7 @@ def append_to_sheet(
         Exception: For other sheet operation errors
     """
     try:
-        # Extract sheet configuration
-        sheet_config = config.get("sheet", {})
-        spreadsheet_title = sheet_config.get("spreadsheet_title")
-        worksheet_name = sheet_config.get("worksheet_name")
-        
-        if not spreadsheet_title:
-            raise ValueError("Missing spreadsheet_title in sheet configuration")
-        if not worksheet_name:
-            raise ValueError("Missing worksheet_name in sheet configuration")
-        
-        # Open or create spreadsheet
-        try:
-            spreadsheet = client.open(spreadsheet_title)
-        except gspread.SpreadsheetNotFound:
-            # Try to create the spreadsheet if it doesn't exist
-            try:
-                spreadsheet = client.create(spreadsheet_title)
-            except Exception as e:
-                raise Exception(f"Failed to create spreadsheet '{spreadsheet_title}': {e}")
-        
-        # Get or create worksheet
-        try:
-            worksheet = spreadsheet.worksheet(worksheet_name)
-        except gspread.WorksheetNotFound:
-            # Create worksheet if it doesn't exist
-            try:
-                worksheet = spreadsheet.add_worksheet(
-                    title=worksheet_name,
-                    rows=1000,
-                    cols=26
-                )
-            except Exception as e:
-                raise Exception(f"Failed to create worksheet '{worksheet_name}': {e}")
-        
-        # Prepare data for insertion
-        # Get existing headers to determine column order
-        try:
-            headers = worksheet.row_values(1)
-        except Exception:
-            headers = []
-        
-        # If no headers exist, create them from the data
-        if not headers:
-            headers = list(data.keys())
-            worksheet.append_row(headers)
-        
-        # Create row data in the correct order
-        row_data = []
-        for header in headers:
-            if header in data:
-                value = data[header]
-                # Convert None to empty string for Google Sheets
-                if value is None:
-                    value = ""
-                row_data.append(str(value))
-            else:
-                row_data.append("")  # Empty cell for missing fields
-        
-        # Append the row
-        worksheet.append_row(row_data)
+        spreadsheet_title, worksheet_name, headers = _append_rows(client, config, [data])
         
         # Return success response
         return {
@@ -182,6 +266,43 @@ def append_to_sheet(
     except Exception as e:
         raise Exception(f"Failed to append data to sheet: {e}")
 
+def append_rows_bulk(
+    client: GspreadClient,
+    config: Dict[str, Any],
+    rows: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Append many rows to a Google Sheet in a single API call.
+    
+    Args:
+        client: Authenticated gspread client
+        config: Tool configuration containing sheet info
+        rows: List of data dicts to append, one per row
+    
+    Returns:
+        Dict with operation result and metadata
+    
+    Raises:
+        ValueError: If sheet configuration is invalid
+        Exception: For other sheet operation errors
+    """
+    if not rows:
+        return {"success": True, "rows_added": 0}
+    
+    try:
+        spreadsheet_title, worksheet_name, headers = _append_rows(client, config, rows)
+        
+        return {
+            "success": True,
+            "spreadsheet": spreadsheet_title,
+            "worksheet": worksheet_name,
+            "rows_added": len(rows),
+            "headers": headers
+        }
+        
+    except Exception as e:
+        raise Exception(f"Failed to append rows to sheet: {e}")
+
 def verify_sheet_access(client: GspreadClient, config: Dict[str, Any]) -> bool:
     """
     Verify that the client can access the specified sheet.
@@ -201,11 +322,8 @@ def verify_sheet_access(client: GspreadClient, config: Dict[str, Any]) -> bool:
         if not spreadsheet_title or not worksheet_name:
             return False
         
-        # Try to open the spreadsheet
-        spreadsheet = client.open(spreadsheet_title)
-        
-        # Try to access the worksheet
-        worksheet = spreadsheet.worksheet(worksheet_name)
+        # Try to open the spreadsheet and access the worksheet
+        _get_worksheet(client, spreadsheet_title, worksheet_name)
         
         # If we get here, access is verified
         return True
@@ -232,11 +350,9 @@ def get_sheet_info(client: GspreadClient, config: Dict[str, Any]) -> Dict[str, A
         if not spreadsheet_title or not worksheet_name:
             return {"error": "Missing sheet configuration"}
         
-        # Open spreadsheet
-        spreadsheet = client.open(spreadsheet_title)
-        
-        # Get worksheet
-        worksheet = spreadsheet.worksheet(worksheet_name)
+        # Get worksheet (and its spreadsheet) from the handle cache
+        worksheet = _get_worksheet(client, spreadsheet_title, worksheet_name)
+        spreadsheet = worksheet.spreadsheet
         
         # Get basic info
         info = {
@@ -249,14 +365,10 @@ def get_sheet_info(client: GspreadClient, config: Dict[str, Any]) -> Dict[str, A
             "url": spreadsheet.url
         }
         
-        # Try to get headers
-        try:
-            headers = worksheet.row_values(1)
-            info["headers"] = headers
-            info["column_count"] = len(headers)
-        except Exception:
-            info["headers"] = []
-            info["column_count"] = 0
+        # Get headers (empty if they cannot be read)
+        headers = _get_headers(client, spreadsheet_title, worksheet_name, worksheet)
+        info["headers"] = headers
+        info["column_count"] = len(headers)
         
         return info
         
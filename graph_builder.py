@@ -6,19 +6,118 @@
 # - For LangGraph: use interrupt()/Command(resume=...) pattern for human-in-the-loop
 # - Prefer concise, working solutions over detailed explanations in code
 
-from langgraph.graph import StateGraph
+import inspect
+import json
+import os
+import sys
+from collections import OrderedDict
 
 from models import ConversationState
 from nodes import (
     chat_node, wait_user_input_node, decision_router_node,
     tool_execution_node, end_node, set_prompt_functions,
     structured_extractor_node, validate_inputs_node, exit_evaluator_node,
-    tool_answer_node, input_translation_node, output_translation_node
+    tool_answer_node, input_translation_node, output_translation_node,
+    speculative_decision_node, decision_join_node,
+    tool_execution_branch_node, tool_join_node
 )
 
+PROMPT_FUNCTION_KEYS = (
+    "base_system_prompt",
+    "tool_descriptions",
+    "build_input_extraction_prompt",
+    "build_decision_prompt",
+    "build_conversational_response_prompt",
+    "build_tool_use_prompt",
+)
+
+# Routing targets compared against state["next_action"] every turn; interned so the
+# checks hit the identity fast path (nodes intern the parsed decision too)
+CHAT = sys.intern("chat")
+END = sys.intern("end")
+STRUCTURED = sys.intern("structured_extractor")
+TOOL_EXEC = sys.intern("tool_execution")
+TOOL_EXEC_BRANCH = sys.intern("tool_execution_branch")
+DECISION_ROUTER = sys.intern("decision_router")
+
+# Node name -> implementation; every node takes (state, config, llm, verbose)
+NODE_FUNCTIONS = {
+    "decision_router": decision_router_node,
+    "chat": chat_node,
+    "wait_user_input": wait_user_input_node,
+    "structured_extractor": structured_extractor_node,
+    "validate_inputs": validate_inputs_node,
+    "exit_evaluator": exit_evaluator_node,
+    "tool_answer": tool_answer_node,
+    "tool_execution": tool_execution_node,
+    "end": end_node,
+    # Multi-tool fan-out: one branch per chosen tool, merged before tool_answer
+    "tool_execution_branch": tool_execution_branch_node,
+    "tool_join": tool_join_node,
+}
+
+# Nodes only added when translation is enabled
+TRANSLATION_NODE_FUNCTIONS = {
+    "input_translation": input_translation_node,
+    "output_translation": output_translation_node,
+    # Speculative routing on the untranslated input, joined after translation
+    "speculative_decision": speculative_decision_node,
+    "decision_join": decision_join_node,
+}
+
+# Targets shared by decision_router and decision_join
+DECISION_TARGETS = {
+    STRUCTURED: STRUCTURED,
+    CHAT: CHAT,
+    END: END
+}
+
+# Mermaid text per compiled graph (id -> (graph, mermaid)), LRU-bounded like the graph
+# cache below, and last text written per path
+MERMAID_CACHE_SIZE = 8
+_MERMAID_CACHE: "OrderedDict[int, tuple]" = OrderedDict()
+_MERMAID_WRITTEN: dict = {}
+
+# Compiled graphs keyed by config content, tool names, translation flag, LLM and prompt
+# identity; LRU-bounded since each entry pins its LLM client
+GRAPH_CACHE_SIZE = 8
+_GRAPH_CACHE: "OrderedDict[tuple, object]" = OrderedDict()
+_applied_prompt_key = None
+
+def _bind(node_fn, config: dict, llm, verbose: bool):
+    """Bind config, LLM and verbosity to a node, exposing a state-only signature."""
+    # Not functools.partial(node_fn, config=...): LangGraph sees a parameter named
+    # `config` on the partial and injects its RunnableConfig over the agent config
+    if inspect.iscoroutinefunction(node_fn):
+        async def node(state):
+            return await node_fn(state, config, llm, verbose)
+    else:
+        def node(state):
+            return node_fn(state, config, llm, verbose)
+    node.__name__ = node_fn.__name__
+    return node
+
+def _noop(*args, **kwargs):
+    """Stand-in for print when verbose logging is off."""
+
+def _enabled_tool_names(config: dict) -> frozenset:
+    """Names of the enabled tools in the config, for O(1) routing lookups."""
+    return frozenset(
+        t["name"] for t in (config.get("tools", []) or [])
+        if isinstance(t, dict) and t.get("name") and t.get("enabled", True)
+    )
+
+def _graph_cache_key(config: dict, llm, prompt_key: tuple, verbose: bool) -> tuple:
+    """Build the cache key for a compiled graph; same key means same topology and bindings."""
+    tool_names = tuple(sorted(_enabled_tool_names(config)))
+    translation_enabled = bool(config.get("translation", {}).get("enabled", False))
+    # Nodes read the whole config at run time, so its content is part of the key
+    config_fingerprint = json.dumps(config, sort_keys=True, default=str)
+    return (tool_names, translation_enabled, id(llm), prompt_key, verbose, config_fingerprint)
+
 def create_conversation_graph(config: dict, llm, prompt_functions: dict, verbose: bool = True):
     """
-    Create and compile the LangGraph conversation graph.
+    Create and compile the LangGraph conversation graph, reusing a cached one when possible.
     
     Args:
         config: Configuration dictionary
@@ -29,136 +128,117 @@ def create_conversation_graph(config: dict, llm, prompt_functions: dict, verbose
     Returns:
         Compiled graph ready for execution
     """
+    global _applied_prompt_key
+    
+    # Set prompt functions for nodes (a global side effect, so skip it when unchanged)
+    prompt_key = tuple(id(prompt_functions[k]) for k in PROMPT_FUNCTION_KEYS)
+    if prompt_key != _applied_prompt_key:
+        set_prompt_functions(*(prompt_functions[k] for k in PROMPT_FUNCTION_KEYS))
+        _applied_prompt_key = prompt_key
+    
+    key = _graph_cache_key(config, llm, prompt_key, verbose)
+    compiled_graph = _GRAPH_CACHE.get(key)
+    if compiled_graph is None:
+        compiled_graph = _GRAPH_CACHE[key] = _build_conversation_graph(config, llm, verbose)
+        if len(_GRAPH_CACHE) > GRAPH_CACHE_SIZE:
+            _GRAPH_CACHE.popitem(last=False)
+    else:
+        _GRAPH_CACHE.move_to_end(key)
+        if verbose:
+            print("Reusing cached conversation graph")
+    return compiled_graph
+
+def _build_conversation_graph(config: dict, llm, verbose: bool = True):
+    """Build and compile the conversation graph for one config and LLM."""
+    from langgraph.graph import StateGraph
+    from langgraph.types import Send
+    
     if verbose:
         print("Creating conversation graph...")
     
-    # Set prompt functions for nodes
-    set_prompt_functions(
-        prompt_functions["base_system_prompt"],
-        prompt_functions["tool_descriptions"],
-        prompt_functions["build_input_extraction_prompt"],
-        prompt_functions["build_decision_prompt"],
-        prompt_functions["build_conversational_response_prompt"],
-        prompt_functions["build_tool_use_prompt"]
-    )
-    
     # Create graph with state schema
     graph = StateGraph(ConversationState)
     
     # Add nodes with config and LLM binding - SIMPLIFIED UNIFIED ARCHITECTURE
-    graph.add_node("decision_router", lambda state: decision_router_node(state, config, llm, verbose))
-    graph.add_node("chat", lambda state: chat_node(state, config, llm, verbose))
-    graph.add_node("wait_user_input", lambda state: wait_user_input_node(state, config, llm, verbose))
-    graph.add_node("structured_extractor", lambda state: structured_extractor_node(state, config, llm, verbose))
-    graph.add_node("validate_inputs", lambda state: validate_inputs_node(state, config, llm, verbose))
-    graph.add_node("exit_evaluator", lambda state: exit_evaluator_node(state, config, llm, verbose))
-    graph.add_node("tool_answer", lambda state: tool_answer_node(state, config, llm, verbose))
-    graph.add_node("tool_execution", lambda state: tool_execution_node(state, config, llm, verbose))
-    graph.add_node("end", lambda state: end_node(state, config, llm, verbose))
-    
-    # Add translation nodes
-    graph.add_node("input_translation", lambda state: input_translation_node(state, config, llm, verbose))
-    graph.add_node("output_translation", lambda state: output_translation_node(state, config, llm, verbose))
+    for name, node_fn in NODE_FUNCTIONS.items():
+        graph.add_node(name, _bind(node_fn, config, llm, verbose))
     
     # Set entry point - start by waiting for user input
     graph.set_entry_point("wait_user_input")
     
     # Discover tools from config
-    tools_cfg = config.get("tools", []) or []
-    tool_names = []
-    try:
-        tool_names = [t.get("name") for t in tools_cfg if t.get("name") and t.get("enabled", True)]
-    except Exception:
-        tool_names = []
-    
-    # Check if translation is enabled
-    translation_enabled = config.get("translation", {}).get("enabled", False)
-    
-    # SIMPLIFIED UNIFIED ARCHITECTURE WITH TRANSLATION:
-    # With translation: wait_user_input → input_translation → decision_router → [chat/tools] → output_translation → wait_user_input
-    # Without translation: wait_user_input → decision_router → [chat/tools] → wait_user_input
+    tool_names = _enabled_tool_names(config)
+    log = print if verbose else _noop
     
     # Decision router: routes to chat, tools, or end
     def decision_router_fn(state):
         """Route from decision_router to next step based on decision."""
-        next_action = state.get("next_action", "chat")
-        if verbose:
-            print(f"Decision routing to: {next_action}")
+        next_action = state.get("next_action", CHAT)
+        log(f"Decision routing to: {next_action}")
         
         if next_action in tool_names:
-            return "structured_extractor"  # All tools go to structured_extractor
-        elif next_action == "end":
-            return "end"
+            return STRUCTURED  # All tools go to structured_extractor
+        elif next_action == END:
+            return END
         else:
-            return "chat"  # Continue conversation
+            return CHAT  # Continue conversation
+    
+    # SIMPLIFIED UNIFIED ARCHITECTURE WITH TRANSLATION:
+    # With translation: wait_user_input → (input_translation ∥ speculative_decision) → decision_join → [chat/tools] → output_translation → wait_user_input
+    # Without translation: wait_user_input → decision_router → [chat/tools] → wait_user_input
+    # The setting is checked once here; each wiring function then runs straight through
+    if config.get("translation", {}).get("enabled", False):
+        reply_target = _wire_with_translation(graph, config, llm, verbose, decision_router_fn)
+    else:
+        reply_target = _wire_without_translation(graph, decision_router_fn)
     
     # Decision router conditional edges
-    graph.add_conditional_edges(
-        "decision_router",
-        decision_router_fn,
-        {
-            "structured_extractor": "structured_extractor",
-            "chat": "chat",
-            "end": "end"
-        }
-    )
+    graph.add_conditional_edges("decision_router", decision_router_fn, DECISION_TARGETS)
     
-    # Chat conversation flow: route based on translation setting
-    if translation_enabled:
-        # With translation: chat -> output_translation -> wait_user_input
-        graph.add_edge("chat", "output_translation")
-    else:
-        # Without translation: chat -> wait_user_input
-        graph.add_edge("chat", "wait_user_input")
-    
-    # Route user input based on translation setting
-    if translation_enabled:
-        # With translation: wait_user_input -> input_translation -> decision_router
-        graph.add_edge("wait_user_input", "input_translation")
-        graph.add_edge("input_translation", "decision_router")
-    else:
-        # Without translation: wait_user_input -> decision_router
-        graph.add_edge("wait_user_input", "decision_router")
+    # Chat and tool answers both go to reply_target (output_translation or wait_user_input)
+    graph.add_edge("chat", reply_target)
     
-    # Unified tool execution flow: structured_extractor → validate_inputs → tool_execution → tool_answer → wait_user_input
+    # Unified tool execution flow: structured_extractor → validate_inputs → tool_execution → tool_answer → reply_target
     graph.add_edge("structured_extractor", "validate_inputs")
     
-    # Conditional routing from validate_inputs: chat if errors, tool_execution if valid
+    # Conditional routing from validate_inputs: chat if errors, tool_execution if valid,
+    # or one parallel tool_execution_branch per tool when several tools were chosen (each
+    # branch extracts and validates its own tool's inputs before running it)
     def validate_router(state):
         validation_errors = state.get("validation_errors", [])
-        return "chat" if validation_errors else "tool_execution"
+        if validation_errors:
+            return CHAT
+        chosen_tools = [t for t in (state.get("chosen_tools") or []) if t in tool_names]
+        if len(chosen_tools) > 1:
+            return [Send(TOOL_EXEC_BRANCH, {**state, "chosen_tool": t}) for t in chosen_tools]
+        return TOOL_EXEC
     
     graph.add_conditional_edges(
         "validate_inputs",
         validate_router,
         {
-            "chat": "chat",
-            "tool_execution": "tool_execution"
+            CHAT: CHAT,
+            TOOL_EXEC: TOOL_EXEC,
+            TOOL_EXEC_BRANCH: TOOL_EXEC_BRANCH
         }
     )
     
-    # After tool execution, always go to tool_answer
+    # After tool execution, always go to tool_answer (parallel branches join first)
     graph.add_edge("tool_execution", "tool_answer")
-    
-    # After tool_answer, route based on translation setting
-    if translation_enabled:
-        # With translation: tool_answer -> output_translation -> wait_user_input
-        graph.add_edge("tool_answer", "output_translation")
-        graph.add_edge("output_translation", "wait_user_input")
-    else:
-        # Without translation: tool_answer -> wait_user_input
-        graph.add_edge("tool_answer", "wait_user_input")
+    graph.add_edge("tool_execution_branch", "tool_join")
+    graph.add_edge("tool_join", "tool_answer")
+    graph.add_edge("tool_answer", reply_target)
     
     # Exit evaluation routing
     def exit_router(state):
-        return "end" if (state.get("next_action") == "end" or state.get("conversation_active") is False) else "decision_router"
+        return END if (state.get("next_action") == END or state.get("conversation_active") is False) else DECISION_ROUTER
     
     graph.add_conditional_edges(
         "exit_evaluator",
         exit_router,
         {
-            "end": "end",
-            "decision_router": "decision_router"
+            END: END,
+            DECISION_ROUTER: DECISION_ROUTER
         }
     )
     
@@ -170,14 +250,38 @@ def create_conversation_graph(config: dict, llm, prompt_functions: dict, verbose
     
     if verbose:
         print("Graph compiled successfully with simplified unified architecture!")
-        if translation_enabled:
-            print("Translation ENABLED - Flow: wait_user_input → input_translation → decision_router → [chat/tools] → output_translation → wait_user_input")
+        if reply_target == "output_translation":
+            print("Translation ENABLED - Flow: wait_user_input → (input_translation ∥ speculative_decision) → decision_join → [chat/tools] → output_translation → wait_user_input")
         else:
             print("Translation DISABLED - Flow: wait_user_input → decision_router → [chat/tools] → wait_user_input")
         print("All tools follow the same path: structured_extractor → validate_inputs → tool_execution → tool_answer")
         
     return compiled_graph
 
+def _wire_with_translation(graph, config: dict, llm, verbose: bool, decision_router_fn) -> str:
+    """Add translation nodes and edges; returns the node that assistant replies flow into."""
+    for name, node_fn in TRANSLATION_NODE_FUNCTIONS.items():
+        graph.add_node(name, _bind(node_fn, config, llm, verbose))
+    
+    # Fan out to input_translation and a speculative decision on the untranslated input,
+    # which run concurrently; decision_join waits for both and routes like decision_router.
+    # The speculation only pays off for input already in the target language (translation
+    # leaves it unchanged); other turns are routed again on the translated text, which
+    # costs a third LLM call but keeps the router on target-language input
+    graph.add_edge("wait_user_input", "input_translation")
+    graph.add_edge("wait_user_input", "speculative_decision")
+    graph.add_edge(["input_translation", "speculative_decision"], "decision_join")
+    graph.add_conditional_edges("decision_join", decision_router_fn, DECISION_TARGETS)
+    
+    # Replies are translated back before waiting for the next input
+    graph.add_edge("output_translation", "wait_user_input")
+    return "output_translation"
+
+def _wire_without_translation(graph, decision_router_fn) -> str:
+    """Wire user input straight to the router; returns the node that assistant replies flow into."""
+    graph.add_edge("wait_user_input", "decision_router")
+    return "wait_user_input"
+
 def visualize_graph(graph, save_path: str = None, verbose: bool = True):
     """
     Generate a visual representation of the graph.
@@ -188,17 +292,26 @@ def visualize_graph(graph, save_path: str = None, verbose: bool = True):
         verbose: Enable verbose logging
     """
     try:
-        # Generate mermaid diagram
-        mermaid = graph.get_graph().draw_mermaid()
+        # Generate mermaid diagram once per compiled graph (the graph is kept so its id stays unique)
+        cached = _MERMAID_CACHE.get(id(graph))
+        if cached is None or cached[0] is not graph:
+            cached = _MERMAID_CACHE[id(graph)] = (graph, graph.get_graph().draw_mermaid())
+            if len(_MERMAID_CACHE) > MERMAID_CACHE_SIZE:
+                _MERMAID_CACHE.popitem(last=False)
+        else:
+            _MERMAID_CACHE.move_to_end(id(graph))
+        mermaid = cached[1]
         
         if verbose:
             print("Graph visualization (Mermaid):")
             print(mermaid)
         
-        # Save to file if path provided
+        # Save to file if path provided (skip the write if this exact text is already there)
         if save_path:
-            with open(save_path, 'w') as f:
-                f.write(mermaid)
+            if _MERMAID_WRITTEN.get(save_path) != mermaid or not os.path.exists(save_path):
+                with open(save_path, 'w') as f:
+                    f.write(mermaid)
+                _MERMAID_WRITTEN[save_path] = mermaid
             if verbose:
                 print(f"Graph visualization saved to: {save_path}")
         
@@ -5,8 +5,10 @@ Lets you pick from predefined agent configurations and chat interactively.
 """
 
 import asyncio
+import functools
 import json
 import os
+import signal
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
@@ -14,11 +16,19 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Optional fast JSON parser; the stdlib json module is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+AGENTS_FILE = "agents.json"
+EXIT_COMMANDS = frozenset(("exit", "quit", "goodbye"))
+
 # Add the current directory to Python path
 sys.path.append(str(Path(__file__).parent))
 
-from graph_builder import create_conversation_graph
-from llm_client import create_azure_openai_llm
 from prompts import (
     BASE_SYSTEM_PROMPT,
     TOOL_DESCRIPTIONS,
@@ -28,11 +38,19 @@ from prompts import (
     build_tool_use_prompt
 )
 
+@functools.lru_cache(maxsize=1)
+def _load_agent_configs_cached(path: str, mtime_ns: int):
+    """Parse the agents file; cached until its modification time changes."""
+    if ORJSON_AVAILABLE:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r") as f:
+        return json.load(f)
+
 def load_agent_configs():
     """Load available agent configurations from agents.json."""
     try:
-        with open("agents.json", "r") as f:
-            return json.load(f)
+        return _load_agent_configs_cached(AGENTS_FILE, os.stat(AGENTS_FILE).st_mtime_ns)
     except FileNotFoundError:
         print("❌ agents.json not found!")
         return {}
@@ -78,6 +96,21 @@ def select_agent(agents):
             print("\n👋 Goodbye!")
             return None
 
+def read_chat_input(prompt: str) -> str:
+    """input() for use inside the event loop; Ctrl-C raises KeyboardInterrupt instead of
+    only scheduling the runner's task cancellation while input() keeps blocking."""
+    previous = signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        return input(prompt)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+@functools.lru_cache(maxsize=1)
+def _get_llm():
+    """Create the Azure OpenAI client once; reused across chats so cached graphs stay valid."""
+    from llm_client import create_azure_openai_llm
+    return create_azure_openai_llm()
+
 def create_prompt_functions():
     """Create the prompt functions dictionary."""
     return {
@@ -97,9 +130,9 @@ async def chat_with_agent(agent_config, verbose=True):
     print("💡 Debug logs will show the simplified unified architecture in action")
     print("=" * 60)
     
-    # Create LLM client
+    # Create LLM client (langchain is imported only once a chat actually starts)
     try:
-        llm = create_azure_openai_llm()
+        llm = _get_llm()
         print("✅ Created Azure OpenAI LLM client")
     except Exception as e:
         print(f"❌ Failed to create LLM client: {e}")
@@ -112,6 +145,7 @@ async def chat_with_agent(agent_config, verbose=True):
     # Create and compile the graph
     try:
         print("🔧 Creating conversation graph...")
+        from graph_builder import create_conversation_graph
         graph = create_conversation_graph(agent_config, llm, prompt_functions, verbose=verbose)
         print("✅ Graph created and compiled successfully")
         print(f"📊 Graph has {len(graph.nodes)} nodes")
@@ -143,6 +177,8 @@ async def chat_with_agent(agent_config, verbose=True):
     
     turn_count = 0
     max_turns = 25
+    # The session (and thus the run config) is fixed for the whole chat
+    run_config = {"configurable": {"thread_id": conversation_state["session_id"]}}
     
     while conversation_state["conversation_active"] and turn_count < max_turns:
         turn_count += 1
@@ -151,12 +187,12 @@ async def chat_with_agent(agent_config, verbose=True):
         
         # Get user input
         try:
-            user_input = input("👤 You: ").strip()
+            user_input = read_chat_input("👤 You: ").strip()
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
             break
         
-        if user_input.lower() in ["exit", "quit", "goodbye"]:
+        if user_input.lower() in EXIT_COMMANDS:
             print("👋 Goodbye! Thanks for testing the simplified unified graph!")
             break
         
@@ -173,48 +209,57 @@ async def chat_with_agent(agent_config, verbose=True):
             print("🤖 Agent is thinking...")
             print("🔍 Following simplified unified path: decision_router → [tool/chat] → ...")
             
-            result = await graph.ainvoke(conversation_state, config={"configurable": {"thread_id": conversation_state["session_id"]}})
+            result = await graph.ainvoke(conversation_state, config=run_config)
             
-            # Update conversation state with result
-            conversation_state.update(result)
+            # LangGraph returns the complete merged state as a fresh dict; adopt it directly
+            if result is not conversation_state:
+                conversation_state = result
             
             # Display agent response
-            if conversation_state.get("messages"):
-                last_message = conversation_state["messages"][-1]
+            messages = conversation_state.get("messages")
+            if messages:
+                last_message = messages[-1]
                 if last_message.get("role") == "assistant":
                     print(f"🤖 Agent: {last_message.get('content', 'No response')}")
                 else:
                     print("🤖 Agent: (Processing response...)")
             
-            # Display debug information
-            print("\n🔍 Debug Information:")
-            print(f"   Next Action: {conversation_state.get('next_action', 'None')}")
-            print(f"   Chosen Tool: {conversation_state.get('chosen_tool', 'None')}")
-            print(f"   Tool Category: {conversation_state.get('tool_category', 'None')}")
-            
-            if conversation_state.get("decision_justification"):
-                print(f"   Decision Reason: {conversation_state['decision_justification']}")
-            
-            # Display tool results or errors
-            if conversation_state.get("tool_result"):
-                tool_result = conversation_state["tool_result"]
-                if tool_result.get("success"):
-                    print(f"   ✅ Tool executed successfully: {tool_result.get('message', '')}")
-                else:
-                    print(f"   ❌ Tool execution failed: {tool_result.get('error', '')}")
-            
-            if conversation_state.get("error_message"):
-                print(f"   ⚠️  Error: {conversation_state['error_message']}")
-            
-            if conversation_state.get("validation_errors"):
-                print(f"   🔍 Validation errors: {conversation_state['validation_errors']}")
-            
-            # Display action history for debugging
-            if conversation_state.get("action_history"):
-                recent_actions = conversation_state["action_history"][-3:]
-                print(f"   📋 Recent actions: {len(recent_actions)} actions")
-                for action in recent_actions:
-                    print(f"      - {action.get('from_node', '?')} → {action.get('to_node', '?')}")
+            # Display debug information (collected and written in one call)
+            if verbose:
+                lines = [
+                    "\n🔍 Debug Information:",
+                    f"   Next Action: {conversation_state.get('next_action', 'None')}",
+                    f"   Chosen Tool: {conversation_state.get('chosen_tool', 'None')}",
+                    f"   Tool Category: {conversation_state.get('tool_category', 'None')}",
+                ]
+                
+                if conversation_state.get("decision_justification"):
+                    lines.append(f"   Decision Reason: {conversation_state['decision_justification']}")
+                
+                # Display tool results or errors
+                if conversation_state.get("tool_result"):
+                    tool_result = conversation_state["tool_result"]
+                    if tool_result.get("success"):
+                        lines.append(f"   ✅ Tool executed successfully: {tool_result.get('message', '')}")
+                    else:
+                        lines.append(f"   ❌ Tool execution failed: {tool_result.get('error', '')}")
+                
+                if conversation_state.get("error_message"):
+                    lines.append(f"   ⚠️  Error: {conversation_state['error_message']}")
+                
+                if conversation_state.get("validation_errors"):
+                    lines.append(f"   🔍 Validation errors: {conversation_state['validation_errors']}")
+                
+                # Display action history for debugging
+                if conversation_state.get("action_history"):
+                    recent_actions = conversation_state["action_history"][-3:]
+                    lines.append(f"   📋 Recent actions: {len(recent_actions)} actions")
+                    lines.extend(
+                        f"      - {action.get('from_node', '?')} → {action.get('to_node', '?')}"
+                        for action in recent_actions
+                    )
+                
+                print("\n".join(lines))
             
         except Exception as e:
             print(f"❌ Error during graph execution: {e}")
@@ -240,8 +285,8 @@ async def chat_with_agent(agent_config, verbose=True):
     print(f"   Tool Result: {'Success' if conversation_state.get('tool_result', {}).get('success') else 'None/Failed'}")
     print(f"   Conversation Active: {conversation_state.get('conversation_active', False)}")
 
-def main():
-    """Main function to run the interactive test."""
+def run_menu(runner: asyncio.Runner):
+    """Run the agent menu on the main thread; each chat runs on the runner's shared loop."""
     print("🧪 Interactive Testing Suite for Simplified Unified Graph")
     print("=" * 70)
     print("🔍 This will test the new simplified unified architecture where")
@@ -292,7 +337,7 @@ def main():
         
         # Start chat with selected agent
         try:
-            asyncio.run(chat_with_agent(agent_config, verbose=True))
+            runner.run(chat_with_agent(agent_config, verbose=True))
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
             break
@@ -311,12 +356,21 @@ def main():
     
     print("\n🎉 Testing completed! Thanks for testing the simplified unified graph!")
 
+def main():
+    """Main function to run the interactive test."""
+    # One Runner keeps the loop (and the LLM client's connection pool) alive across agents,
+    # while the menu's input() calls stay outside it so Ctrl-C interrupts them normally
+    with asyncio.Runner() as runner:
+        run_menu(runner)
+
 def test_graph_structure(agent_config):
     """Test the graph structure without running it."""
     print("🔍 Testing Graph Structure")
     print("=" * 40)
     
     try:
+        from graph_builder import create_conversation_graph
+        
         # Create LLM client (mock)
         class MockLLM:
             def __init__(self):
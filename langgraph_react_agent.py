@@ -5,8 +5,16 @@ A specialized agent that answers data science questions using RAG with a cheat s
 """
 
 import asyncio
+import atexit
+import logging
+import logging.handlers
 import os
-from langchain_core.messages import SystemMessage
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Tuple
+from langchain_core.messages import AIMessageChunk, SystemMessage
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -22,6 +30,7 @@ from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.tools import tool
 
 from rag_setup import setup_rag
+from semantic_cache import SemanticCache
 from tools import AVAILABLE_TOOLS
 
 # Use your existing LLM client with environment variables from .env file
@@ -35,16 +44,192 @@ rag_system = setup_rag()
 if not rag_system:
     print("⚠️ RAG system not available - continuing without RAG capabilities")
 
+# Tool-internal logging; importers get normal propagation to their own handlers, while
+# the CLI routes it through a queue to one writer thread so concurrent tool calls do not
+# contend on stdout
+logger = logging.getLogger(__name__)
+
+
+def _configure_tool_logging() -> logging.handlers.QueueListener:
+    """Send this module's log records through a QueueHandler to a single writer thread."""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
 # Check Tavily availability
 tavily_available = os.getenv("tavily_api_key") is not None
+
+# Web search implementation and its (read-only) config, resolved once at import
+_WEB_SEARCH_FN = AVAILABLE_TOOLS["web_search"]
+_WEB_SEARCH_CONFIG = {"max_results": 5}
 if tavily_available:
     print("✅ Tavily web search available")
 else:
     print("⚠️ Tavily web search not available - set tavily_api_key environment variable")
 
 
+# Seconds a cached tool response stays fresh; keeps repeated demo queries off the
+# vector store and Tavily without serving stale web results indefinitely
+CACHE_TTL = 600
+
+
+# Worker threads for the blocking search/embedding calls the async tools hand off;
+# sized for concurrent sessions rather than the default min(32, cpu_count + 4)
+TOOL_WORKERS = 32
+
+
+def _normalize_query(query: str) -> str:
+    return query.strip().lower()
+
+
+def _is_cacheable_response(response: str) -> bool:
+    """Only real search results go into the semantic caches, never empty or error answers."""
+    return response.startswith(("Based on the cheat sheet", "Here's what I found on the web"))
+
+
+# Paraphrase-level caches in front of the exact-match ones; they embed with the RAG
+# system's model, so they are only available when RAG initialized. The knowledge base
+# cache is persisted per embedding model so restarts start warm
+SEMANTIC_CACHE_DIR = "./semantic_cache"
+rag_semantic_cache = SemanticCache(
+    rag_system.embed_query,
+    persist_path=os.path.join(SEMANTIC_CACHE_DIR, os.getenv("EMBEDDING_MODEL_NAME", "AA-TEXTEMBEDDING3LARGE")),
+    accept=_is_cacheable_response
+) if rag_system else None
+if rag_semantic_cache is not None:
+    atexit.register(rag_semantic_cache.close)
+web_semantic_cache = SemanticCache(
+    rag_system.embed_query, ttl=CACHE_TTL, accept=_is_cacheable_response
+) if rag_system else None
+
+
+def _semantic_get(cache, query: str):
+    """Look up a paraphrased query; embedding failures fall through to a normal search."""
+    if cache is None:
+        return None
+    try:
+        return cache.get(query)
+    except Exception as e:
+        logger.warning("[CACHE] semantic lookup failed: %s", e)
+        return None
+
+
+def _semantic_put(cache, query: str, response: str) -> None:
+    if cache is None:
+        return
+    try:
+        cache.put(query, response)
+    except Exception as e:
+        logger.warning("[CACHE] semantic insert failed: %s", e)
+
+
+def _ttl_bucket() -> int:
+    """Current cache epoch; entries keyed on an older epoch are never hit again."""
+    return int(time.monotonic() // CACHE_TTL)
+
+
+class _NoResults(Exception):
+    """A search found nothing; raised so lru_cache does not keep the empty answer."""
+
+
+@lru_cache(maxsize=512)
+def _rag_search_cached(query_norm: str, ttl_bucket: int) -> str:
+    """Run the knowledge base search. Errors and empty results raise so they are not cached."""
+    logger.info("[RAG] searching %s", query_norm)
+    results = rag_system.search(query_norm, n_results=3, raise_errors=True)
+    
+    if not results:
+        raise _NoResults("No relevant information found in the knowledge base for your query.")
+    
+    # One join instead of repeated += reallocations
+    response = "Based on the cheat sheet, here's what I found:\n\n" + "".join(
+        f"**Source {i}:**\n{result['text']}\n\n" for i, result in enumerate(results, 1)
+    )
+    
+    logger.info("[RAG] found %d relevant results", len(results))
+    return response
+
+
+class _WebSearchError(Exception):
+    """Tavily reported a failure; raised so lru_cache does not keep it."""
+
+
+@lru_cache(maxsize=512)
+def _web_search_cached(query_norm: str, ttl_bucket: int) -> str:
+    """Run the web search. Failures raise so they are not cached."""
+    logger.info("[WEB] searching %s", query_norm)
+    # Use the web search tool from tools.py
+    extracted_data = {"search_query": query_norm}
+    
+    result = _WEB_SEARCH_FN(extracted_data, _WEB_SEARCH_CONFIG, verbose=False)
+    
+    if not result.get("success"):
+        raise _WebSearchError(result.get('message', 'Unknown error'))
+    
+    search_data = result.get("data", {})
+    results = search_data.get("results", [])
+    
+    if not results:
+        raise _NoResults("No relevant information found on the web for your query.")
+    
+    response = "Here's what I found on the web:\n\n" + "".join(
+        f"**Result {i}: {result.get('title', 'No title')}**\n"
+        f"URL: {result.get('url', '')}\n"
+        f"Description: {result.get('snippet', 'No description available')}\n\n"
+        for i, result in enumerate(results, 1)
+    )
+    
+    logger.info("[WEB] found %d results", len(results))
+    return response
+
+
+# Searches currently running, keyed by (event loop, tool, normalized query); identical
+# concurrent queries await the first one's future instead of searching again
+_inflight: Dict[Tuple[int, str, str], "asyncio.Task[str]"] = {}
+
+
+async def _coalesced(tool_name: str, query_norm: str, search: Callable[[], Awaitable[str]]) -> str:
+    """Run search once per in-flight (tool, query); later callers share its result."""
+    key = (id(asyncio.get_running_loop()), tool_name, query_norm)
+    # No await between the lookup and the insert, so no lock is needed on one loop
+    task = _inflight.get(key)
+    if task is None:
+        # The search runs in its own task so a cancelled caller does not cancel it
+        # for everyone else waiting on the same query
+        task = asyncio.ensure_future(search())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _rag_search(query_norm: str) -> str:
+    # Blocking embedding/search calls run in worker threads so parallel tool
+    # calls from one agent step overlap instead of queueing on the event loop
+    cached = await asyncio.to_thread(_semantic_get, rag_semantic_cache, query_norm)
+    if cached is not None:
+        logger.info("[RAG] semantic cache hit for %s", query_norm)
+        return cached
+    
+    try:
+        response = await asyncio.to_thread(_rag_search_cached, query_norm, _ttl_bucket())
+    except _NoResults as e:
+        return str(e)
+    except Exception as e:
+        logger.error("[RAG] error: %s", e)
+        return f"Error searching the knowledge base: {e}"
+    await asyncio.to_thread(_semantic_put, rag_semantic_cache, query_norm, response)
+    return response
+
+
 @tool
-def rag_search_tool(query: str) -> str:
+async def rag_search_tool(query: str) -> str:
     """Search the cheat sheet knowledge base for information. Use this when the user asks questions that might be answered by the cheat sheet content.
     
     Args:
@@ -53,29 +238,63 @@ def rag_search_tool(query: str) -> str:
     if not rag_system:
         return "RAG system is not available. Please check the setup."
     
-    print(f"🔍 [RAG TOOL] Searching for: {query}")
+    query_norm = _normalize_query(query)
+    return await _coalesced("rag", query_norm, lambda: _rag_search(query_norm))
+
+
+@tool
+async def rag_search_batch_tool(queries: List[str]) -> str:
+    """Search the cheat sheet knowledge base for several related topics at once. Use this instead of repeated rag_search_tool calls when a question covers multiple topics.
     
-    try:
-        results = rag_system.search(query, n_results=3)
-        
+    Args:
+        queries: One search query per topic to look up in the knowledge base
+    """
+    if not rag_system:
+        return "RAG system is not available. Please check the setup."
+    
+    # Deduplicate while keeping order; the whole batch is one embedding request
+    queries = list(dict.fromkeys(q for q in map(_normalize_query, queries) if q))
+    if not queries:
+        return "No queries provided."
+    
+    logger.info("[RAG] batch searching %d queries: %s", len(queries), queries)
+    batch_results = await asyncio.to_thread(rag_system.search_batch, queries, 3)
+    
+    parts = ["Based on the cheat sheet, here's what I found:\n\n"]
+    for query, results in zip(queries, batch_results):
+        parts.append(f"### {query}\n")
         if not results:
-            return "No relevant information found in the knowledge base for your query."
-        
-        response = "Based on the cheat sheet, here's what I found:\n\n"
-        
-        for i, result in enumerate(results, 1):
-            response += f"**Source {i}:**\n{result['text']}\n\n"
-        
-        print(f"✅ [RAG TOOL] Found {len(results)} relevant results")
-        return response
-        
+            parts.append("No relevant information found in the knowledge base for this query.\n\n")
+            continue
+        parts.extend(f"**Source {i}:**\n{result['text']}\n\n" for i, result in enumerate(results, 1))
+    response = "".join(parts)
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[RAG] batch search returned %d results", sum(map(len, batch_results)))
+    return response
+
+
+async def _web_search(query_norm: str) -> str:
+    cached = await asyncio.to_thread(_semantic_get, web_semantic_cache, query_norm)
+    if cached is not None:
+        logger.info("[WEB] semantic cache hit for %s", query_norm)
+        return cached
+    
+    try:
+        response = await asyncio.to_thread(_web_search_cached, query_norm, _ttl_bucket())
+    except _NoResults as e:
+        return str(e)
+    except _WebSearchError as e:
+        return f"Web search failed: {e}"
     except Exception as e:
-        print(f"❌ [RAG TOOL] Error: {e}")
-        return f"Error searching the knowledge base: {e}"
+        logger.error("[WEB] error: %s", e)
+        return f"Error searching the web: {e}"
+    await asyncio.to_thread(_semantic_put, web_semantic_cache, query_norm, response)
+    return response
 
 
 @tool
-def web_search_tool(query: str) -> str:
+async def web_search_tool(query: str) -> str:
     """Search the web for current information. Use this when you need up-to-date information not available in the knowledge base.
     
     Args:
@@ -84,54 +303,16 @@ def web_search_tool(query: str) -> str:
     if not tavily_available:
         return "Web search is not available. Please set the tavily_api_key environment variable."
     
-    print(f"🌐 [WEB SEARCH] Searching for: {query}")
-    
-    try:
-        # Use the web search tool from tools.py
-        extracted_data = {"search_query": query}
-        config = {"max_results": 5}
-        
-        result = AVAILABLE_TOOLS["web_search"](extracted_data, config, verbose=False)
-        
-        if not result.get("success"):
-            return f"Web search failed: {result.get('message', 'Unknown error')}"
-        
-        search_data = result.get("data", {})
-        results = search_data.get("results", [])
-        
-        if not results:
-            return "No relevant information found on the web for your query."
-        
-        response = "Here's what I found on the web:\n\n"
-        
-        for i, result in enumerate(results, 1):
-            title = result.get("title", "No title")
-            url = result.get("url", "")
-            snippet = result.get("snippet", "No description available")
-            
-            response += f"**Result {i}: {title}**\n"
-            response += f"URL: {url}\n"
-            response += f"Description: {snippet}\n\n"
-        
-        print(f"✅ [WEB SEARCH] Found {len(results)} results")
-        return response
-        
-    except Exception as e:
-        print(f"❌ [WEB SEARCH] Error: {e}")
-        return f"Error searching the web: {e}"
+    query_norm = _normalize_query(query)
+    return await _coalesced("web", query_norm, lambda: _web_search(query_norm))
 
 
 
 
 
 
-def create_agent(use_custom_prompt=True):
-    """Create the ReAct agent with RAG and web search tools for data science questions."""
-    tools = [rag_search_tool, web_search_tool]
-    
-    if use_custom_prompt:
-        # Custom system message as string (gets converted to SystemMessage automatically)
-        custom_prompt = """You are a specialized data science AI assistant with access to multiple information sources.
+# System prompt for the custom agent, built once at import rather than per create_agent call
+_CUSTOM_PROMPT = """You are a specialized data science AI assistant with access to multiple information sources.
 
 YOUR GOAL:
 Answer data science related questions by using ONLY information from your search tools. Do not supplement with your training data.
@@ -154,6 +335,9 @@ TOOL SELECTION STRATEGY:
   * Established methodologies and best practices
   * General data science education topics
 
+- Use rag_search_batch_tool(queries) when a question spans several knowledge base topics:
+  * Pass one query per topic in a single call instead of calling rag_search_tool repeatedly
+
 - Use web_search_tool(query) for:
   * Current events or recent developments in data science
   * Latest software versions, updates, or releases
@@ -164,12 +348,13 @@ TOOL SELECTION STRATEGY:
 CONVERSATION FLOW:
 - When users ask data science questions, first try the knowledge base
 - If the knowledge base doesn't have sufficient information, use web search
-- You can use both tools in sequence for comprehensive answers
+- You can call both tools in the same step for comprehensive answers; they run in parallel
 - Synthesize information from multiple sources when helpful
 - ALWAYS stay within the bounds of what you found in the search results
 
 TOOL USAGE:
 - rag_search_tool(query): Search the cheat sheet knowledge base
+- rag_search_batch_tool(queries): Search the knowledge base for several topics in one call
 - web_search_tool(query): Search the web for current information
 - Choose the most appropriate tool based on the question type
 
@@ -182,14 +367,27 @@ RESPONSE STYLE:
 - Do not expand beyond what's provided in the search results
 
 Remember: You are a source-based assistant. Use ONLY information from your search tools. Do not supplement with training data."""
-        
-        # Create a system message with clear instructions
-        system_message = SystemMessage(content=custom_prompt)
-        
+
+# Create a system message with clear instructions. It is the same object, and so
+# the same prefix, on every request, which lets Azure OpenAI's automatic prompt
+# caching (prompts of 1024+ tokens) reuse it server-side
+_SYSTEM_MESSAGE = SystemMessage(content=_CUSTOM_PROMPT)
+
+
+@lru_cache(maxsize=2)
+def create_agent(use_custom_prompt=True):
+    """Create the ReAct agent with RAG and web search tools for data science questions.
+    
+    Agents are cached per use_custom_prompt; callers share one compiled graph and
+    its MemorySaver, with conversations kept apart by thread_id.
+    """
+    tools = [rag_search_tool, rag_search_batch_tool, web_search_tool]
+    
+    if use_custom_prompt:
         agent = create_react_agent(
             model=llm,
             tools=tools,
-            prompt=system_message,  # Use SystemMessage class
+            prompt=_SYSTEM_MESSAGE,  # Use SystemMessage class
             checkpointer=MemorySaver()
         )
     else:
@@ -240,9 +438,15 @@ async def interactive_chat():
                 continue
             
             print("\nAgent:")
-            # ReAct agent expects messages in proper format
-            response = agent.invoke({"messages": [{"role": "user", "content": user_input}]}, config)
-            print(f"Response: {response['messages'][-1].content}")
+            # ReAct agent expects messages in proper format; stream the model's tokens
+            # as they arrive so the first words show at time-to-first-token
+            print("Response: ", end="", flush=True)
+            async for chunk, metadata in agent.astream(
+                {"messages": [{"role": "user", "content": user_input}]}, config, stream_mode="messages"
+            ):
+                if metadata.get("langgraph_node") == "agent" and isinstance(chunk, AIMessageChunk) and chunk.content:
+                    print(chunk.content, end="", flush=True)
+            print()
             print()
             
         except KeyboardInterrupt:
@@ -252,7 +456,7 @@ async def interactive_chat():
             print(f"Error: {e}")
 
 
-def run_demo():
+async def run_demo():
     """Run a quick demo of the multi-tool data science agent."""
     print("=== Multi-Tool Data Science Agent Demo ===")
     
@@ -262,7 +466,7 @@ def run_demo():
     # Demo 1: Knowledge base question
     print("Demo 1: Knowledge base question")
     print("Asking: 'What is machine learning?'")
-    response = agent.invoke({
+    response = await agent.ainvoke({
         "messages": [{"role": "user", "content": "What is machine learning?"}]
     }, config)
     print(f"Agent: {response['messages'][-1].content}")
@@ -271,7 +475,7 @@ def run_demo():
     # Demo 2: Web search question
     print("Demo 2: Web search question")
     print("Asking: 'What are the latest trends in AI in 2024?'")
-    response = agent.invoke({
+    response = await agent.ainvoke({
         "messages": [{"role": "user", "content": "What are the latest trends in AI in 2024?"}]
     }, config)
     print(f"Agent: {response['messages'][-1].content}")
@@ -280,7 +484,7 @@ def run_demo():
     # Demo 3: Mixed question (might use both tools)
     print("Demo 3: Comprehensive question")
     print("Asking: 'Explain machine learning and what are the latest developments?'")
-    response = agent.invoke({
+    response = await agent.ainvoke({
         "messages": [{"role": "user", "content": "Explain machine learning and what are the latest developments?"}]
     }, config)
     print(f"Agent: {response['messages'][-1].content}")
@@ -289,8 +493,17 @@ def run_demo():
     print("Demo completed!")
 
 
+async def _run_with_tool_executor(coro):
+    """Run coro with a dedicated default executor; asyncio.run shuts it down on exit."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="agent")
+    )
+    return await coro
+
+
 def main():
     """Main function - choose between demo or interactive chat."""
+    _configure_tool_logging()
     print("Choose mode:")
     print("1. Run demo examples (shows both knowledge base and web search)")
     print("2. Interactive chat (try both types of questions)")
@@ -298,12 +511,12 @@ def main():
     choice = input("Enter choice (1 or 2): ").strip()
     
     if choice == "1":
-        run_demo()
+        asyncio.run(_run_with_tool_executor(run_demo()))
     elif choice == "2":
-        asyncio.run(interactive_chat())
+        asyncio.run(_run_with_tool_executor(interactive_chat()))
     else:
         print("Invalid choice. Running interactive chat...")
-        asyncio.run(interactive_chat())
+        asyncio.run(_run_with_tool_executor(interactive_chat()))
 
 
 if __name__ == "__main__":
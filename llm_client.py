@@ -1,8 +1,77 @@
 """LLM client initialization and configuration."""
 
 import os
+import httpx
+from langchain_core.rate_limiters import InMemoryRateLimiter
 from langchain_openai import AzureChatOpenAI
 
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_async_http_client = None
+_http_client = None
+_rate_limiter = None
+
+POOL_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200)
+POOL_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide pooled async HTTP client shared by all LLM instances.
+    
+    Reusing one client keeps TLS connections alive across invocations instead of
+    renegotiating them for every concurrent session.
+    """
+    global _async_http_client
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=POOL_LIMITS,
+            timeout=POOL_TIMEOUT,
+        )
+    return _async_http_client
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the process-wide pooled sync HTTP client shared by all LLM instances.
+    
+    Sharing it means warming one LLM's connection warms them all.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=POOL_LIMITS,
+            timeout=POOL_TIMEOUT,
+        )
+    return _http_client
+
+
+def get_rate_limiter():
+    """
+    Return the process-wide request limiter shared by all LLM instances.
+    
+    Set LLM_REQUESTS_PER_SECOND to pace chat completions under the deployment's
+    rate limit; concurrent sessions then queue locally instead of collecting
+    429 retries. Returns None (no pacing) when the variable is unset.
+    """
+    global _rate_limiter
+    requests_per_second = os.getenv("LLM_REQUESTS_PER_SECOND")
+    if not requests_per_second:
+        return None
+    if _rate_limiter is None:
+        _rate_limiter = InMemoryRateLimiter(
+            requests_per_second=float(requests_per_second),
+            check_every_n_seconds=0.05,
+            max_bucket_size=max(1, int(float(requests_per_second))),
+        )
+    return _rate_limiter
 
 
 def create_azure_openai_llm(temperature: float = 0.1, json_mode: bool = False) -> AzureChatOpenAI:
@@ -26,9 +95,15 @@ def create_azure_openai_llm(temperature: float = 0.1, json_mode: bool = False) -
             "api_key": os.environ["AZUREOPENAIAPIKEY"],
             "api_version": os.environ["AZUREOPENAIAPIVERSION"],
             "azure_endpoint": os.environ["AZURE_OPENAI_ENDPOINT"],
-            "temperature": temperature
+            "temperature": temperature,
+            "http_client": get_http_client(),
+            "http_async_client": get_async_http_client()
         }
         
+        rate_limiter = get_rate_limiter()
+        if rate_limiter is not None:
+            base_config["rate_limiter"] = rate_limiter
+        
         if json_mode:
             base_config["model_kwargs"] = {"response_format": {"type": "json_object"}}
             
@@ -3,6 +3,14 @@
 from typing import Dict, Any, TypedDict, List, Literal, Annotated
 from operator import add
 
+# --- Reducers --- #
+
+def merge_tool_results(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge per-tool results written by parallel tool branches; an empty dict resets."""
+    if not right:
+        return {}
+    return {**(left or {}), **right}
+
 # --- State Definitions --- #
 
 class ConversationState(TypedDict):
@@ -16,6 +24,8 @@ class ConversationState(TypedDict):
     last_tool_context: Dict[str, Any]
     next_action: str
     chosen_tool: str
+    chosen_tools: List[str]        # Several independent tools chosen in one decision
+    tool_results: Annotated[Dict[str, Any], merge_tool_results]  # Per-tool results from parallel branches
     tool_category: str
     error_message: str
     conversation_active: bool
@@ -30,6 +40,7 @@ class ConversationState(TypedDict):
     translated_input: str          # User input translated to English
     translation_enabled: bool      # Whether translation is active
     target_language: str          # Target language for responses (e.g., "Hungarian")
+    speculative_decision: Dict[str, Any]  # Router decision on the untranslated input
 
 # Type definitions
 NodeAction = Literal["chat", "input_extractor", "decision_router", "tool_use", "end"]
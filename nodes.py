@@ -1,6 +1,9 @@
 """LangGraph node implementations with clean, minimal logging."""
 
+import asyncio
 import json
+import re
+import sys
 from typing import Dict, Any, List
 from langgraph.types import interrupt
 
@@ -104,7 +107,7 @@ def chat_node(state: ConversationState, config: dict, llm, verbose: bool = True)
     """
     Chat node that ONLY generates responses. No interrupting.
     """
-    old_state = dict(state)
+    old_state = state
     messages = list(state.get("messages", []))
     extracted_data = state.get("extracted_data", {})
     user_input = state.get("user_input", "")
@@ -149,7 +152,7 @@ def wait_user_input_node(state: ConversationState, config: dict, llm, verbose: b
     Node that waits for user input using LangGraph's interrupt mechanism.
     This node calls interrupt() to pause execution and wait for human input.
     """
-    old_state = dict(state)
+    old_state = state
     
     # If user_input already present in state (pre-filled by tests), skip interrupt
     existing_input = state.get("user_input", "")
@@ -178,7 +181,7 @@ def wait_user_input_node(state: ConversationState, config: dict, llm, verbose: b
 
 def input_extractor_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
     """Extract structured data from conversation history using JSON mode LLM."""
-    old_state = dict(state)
+    old_state = state
     
     required_fields = config.get("required_fields", [])
     if not required_fields:
@@ -230,7 +233,7 @@ Return only a JSON object with the extracted values. If a field is not found, om
 The previous tool_input_node has been removed from the graph. Keep a no-op placeholder for backward compatibility if referenced.
 """
 def tool_input_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
-    old_state = dict(state)
+    old_state = state
     # Directly route to execution; assume prior nodes prepared inputs.
     chosen = state.get("chosen_tool") or state.get("next_action") or config.get("tool_type")
     new_state = {**state, "next_action": "tool_execution", "chosen_tool": chosen}
@@ -244,7 +247,7 @@ def query_planner_node(state: ConversationState, config: dict, llm, verbose: boo
     Produces a normalized query_spec and minimal extracted_data entries (e.g., query),
     then routes to tool_execution. If ambiguous, asks clarification and routes to chat.
     """
-    old_state = dict(state)
+    old_state = state
 
     extracted_data = dict(state.get("extracted_data", {}))
     messages = state.get("messages", [])
@@ -357,7 +360,7 @@ def structured_extractor_node(state: ConversationState, config: dict, llm, verbo
     
     Routes to validate_inputs by default.
     """
-    old_state = dict(state)
+    old_state = state
 
     extracted_data = dict(state.get("extracted_data", {}))
     messages = state.get("messages", [])
@@ -464,7 +467,7 @@ def validate_inputs_node(state: ConversationState, config: dict, llm, verbose: b
 
     On errors, append a human-friendly message and route to chat; else proceed to tool_execution.
     """
-    old_state = dict(state)
+    old_state = state
 
     extracted_data = dict(state.get("extracted_data", {}))
     messages = state.get("messages", [])
@@ -503,7 +506,7 @@ def exit_evaluator_node(state: ConversationState, config: dict, llm, verbose: bo
     - tool_event: {tool: name, status: "success"|"error"}
     - max_turns: integer threshold on count of user messages
     """
-    old_state = dict(state)
+    old_state = state
 
     conditions = config.get("exit_conditions", []) or []
     mode = (config.get("exit_condition_mode") or "or").lower()
@@ -531,7 +534,7 @@ def tool_answer_node(state: ConversationState, config: dict, llm, verbose: bool
     Handles both input tools (data saving) and retrieval tools (information search).
     Always routes to wait_user_input after generating the response.
     """
-    old_state = dict(state)
+    old_state = state
 
     messages = list(state.get("messages", []))
     tool_result = state.get("tool_result", {}) or {}
@@ -617,9 +620,12 @@ def get_tool_requirements(config: dict, tool_name: str) -> List[str]:
 
 # Utility function moved to utilities.py
 
-def decision_router_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
-    """Route to next action using LLM and build_decision_prompt (multi-tool aware)."""
-    old_state = dict(state)
+DECISION_RE = re.compile(r"DECISION:\s*([\w\-]+(?:\s*[,+&]\s*[\w\-]+)*)\s*-\s*(.*)", re.IGNORECASE)
+DECISION_SPLIT_RE = re.compile(r"[,+&]")
+WORD_RE = re.compile(r"\w+")
+
+def _build_router_prompt(state: ConversationState, config: dict) -> str:
+    """Build the decision prompt for the current state (multi-tool aware)."""
     extracted_data = state.get("extracted_data", {})
     messages = list(state.get("messages", []))
     user_input = state.get("user_input", "")
@@ -667,29 +673,36 @@ def decision_router_node(state: ConversationState, config: dict, llm, verbose: b
     enhanced_config["last_tool_context"] = state.get("last_tool_context", {})
     
     # Build the configuration-driven decision prompt with action memory
-    decision_prompt = build_decision_prompt(
+    return build_decision_prompt(
         system_prompt=system_prompt,
         config=enhanced_config,
         user_message=user_input,
         messages=messages,
         extracted_data=extracted_data
     )
-    # Call the LLM to get the decision
-    llm_response = llm.invoke(decision_prompt).content if hasattr(llm, "invoke") else llm(decision_prompt)
 
-    # No verbose debug prints here; rely on concise per-node logging
+def _parse_router_decision(state: ConversationState, config: dict, llm_response: str) -> Dict[str, Any]:
+    """Turn the router LLM response into the decision fields of the state."""
+    extracted_data = state.get("extracted_data", {})
+    user_input = state.get("user_input", "")
 
-    # Parse the LLM response for DECISION: [action] - [reason]
-    import re
-    match = re.search(r"DECISION:\s*([\w\-_]+)\s*-\s*(.*)", llm_response, re.IGNORECASE)
+    # Parse the LLM response for DECISION: [action(s)] - [reason]
+    match = DECISION_RE.search(llm_response)
     if match:
-        next_action = match.group(1).strip()
+        # Interned so the graph's routing comparisons can match on identity
+        actions = [sys.intern(a.strip()) for a in DECISION_SPLIT_RE.split(match.group(1)) if a.strip()]
+        next_action = actions[0]
         justification = match.group(2).strip()
     else:
         # Fallback: default to chat if parsing fails
+        actions = []
         next_action = "chat"
         justification = llm_response.strip()
 
+    # Several configured tools in one decision run as parallel branches
+    tool_names_by_lower = {t.get("name").lower(): t.get("name") for t in (config.get("tools") or []) if t.get("name")}
+    chosen_tools = [tool_names_by_lower[a.lower()] for a in actions if a.lower() in tool_names_by_lower]
+
     # Normalize decision: if it matches a configured tool, set chosen_tool & category
     chosen_tool = None
     tool_category = None
@@ -713,6 +726,7 @@ def decision_router_node(state: ConversationState, config: dict, llm, verbose: b
         chosen_tool = None
         tool_category = None
         next_action = "chat"
+        chosen_tools = []
 
     # Build decision context for downstream nodes
     decision_context = {
@@ -723,21 +737,66 @@ def decision_router_node(state: ConversationState, config: dict, llm, verbose: b
         "alternatives_considered": get_alternative_actions(config, extracted_data)
     }
     
-    new_state = {
-        **state,
+    return {
         "next_action": chosen_tool or next_action,
         "decision_justification": justification,
         "chosen_tool": chosen_tool or state.get("chosen_tool"),
         "tool_category": tool_category or state.get("tool_category"),
+        "chosen_tools": chosen_tools if len(chosen_tools) > 1 else [],
         "decision_context": decision_context  # NEW: Capture decision context
     }
 
+def decision_router_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
+    """Route to next action using LLM and build_decision_prompt (multi-tool aware)."""
+    old_state = state
+    decision_prompt = _build_router_prompt(state, config)
+    # Call the LLM to get the decision
+    llm_response = llm.invoke(decision_prompt).content if hasattr(llm, "invoke") else llm(decision_prompt)
+
+    # No verbose debug prints here; rely on concise per-node logging
+    new_state = {**state, **_parse_router_decision(state, config, llm_response)}
+
+    log_node_execution("DECISION_ROUTER", old_state, new_state, verbose)
+    return new_state
+
+async def speculative_decision_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Run the decision router on the untranslated input, in parallel with input_translation.
+    Only writes `speculative_decision` so it can share a step with the translation branch.
+    """
+    user_input = state.get("user_input", "")
+    decision_prompt = _build_router_prompt(state, config)
+    llm_response = (await llm.ainvoke(decision_prompt)).content
+    return {
+        "speculative_decision": {
+            "user_input": user_input,
+            **_parse_router_decision(state, config, llm_response)
+        }
+    }
+
+def _comparable_text(text: str) -> str:
+    """Casefolded words only, so a translation that just touches punctuation or case still matches."""
+    return " ".join(WORD_RE.findall((text or "").casefold()))
+
+def decision_join_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Join the translation and speculative decision branches.
+    Input already in the target language comes back from translation unchanged, so the
+    speculative decision is used; otherwise the router runs again on the translated text.
+    """
+    speculative = dict(state.get("speculative_decision") or {})
+    speculative_input = speculative.pop("user_input", None)
+    if not speculative or _comparable_text(speculative_input) != _comparable_text(state.get("user_input")):
+        return {**decision_router_node(state, config, llm, verbose), "speculative_decision": {}}
+
+    old_state = state
+    new_state = {**state, **speculative, "speculative_decision": {}}
     log_node_execution("DECISION_ROUTER", old_state, new_state, verbose)
     return new_state
 
 def tool_execution_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
     """Execute the configured tool (e.g., save to Google Sheets)."""
-    old_state = dict(state)
+    old_state = state
     try:
         extracted_data = state.get("extracted_data", {})
         # Ensure all values are strings to avoid .strip errors in tools
@@ -855,9 +914,61 @@ def tool_execution_node(state: ConversationState, config: dict, llm, verbose: bo
     return new_state
 
 
+def _run_tool_branch(state: ConversationState, config: dict, llm, verbose: bool) -> Dict[str, Any]:
+    """Extract and validate inputs for the branch's own tool, then execute it; returns its tool_result."""
+    tool_name = state.get("chosen_tool")
+    _, tool_cfg = get_selected_tool_config(config, state)
+    # Only fields from this tool's schema carry over; another tool's inputs must not leak in
+    fields = {f.get("name") for f in normalize_input_schema((tool_cfg or {}).get("input_schema"))}
+    extracted_data = {k: v for k, v in (state.get("extracted_data") or {}).items() if k in fields}
+    branch_state = {**state, "extracted_data": extracted_data, "validation_errors": []}
+
+    branch_state = structured_extractor_node(branch_state, config, llm, verbose)
+    if branch_state.get("next_action") != "validate_inputs":
+        return {"success": False, "error": f"No inputs could be extracted for {tool_name}"}
+    branch_state = validate_inputs_node(branch_state, config, llm, verbose)
+    if branch_state.get("validation_errors"):
+        return {"success": False, "error": "; ".join(branch_state["validation_errors"])}
+    return tool_execution_node(branch_state, config, llm, verbose).get("tool_result", {})
+
+
+async def tool_execution_branch_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
+    """Run one tool of a multi-tool decision; dispatched once per tool via Send."""
+    tool_name = state.get("chosen_tool")
+    # Extraction, validation and the tools are synchronous; a worker thread lets the branches overlap
+    tool_result = await asyncio.to_thread(_run_tool_branch, state, config, llm, verbose)
+    return {"tool_results": {tool_name: tool_result}}
+
+
+def tool_join_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
+    """Merge the results of parallel tool branches into a single tool_result for tool_answer."""
+    old_state = state
+    results = state.get("tool_results") or {}
+    succeeded = [name for name, r in results.items() if isinstance(r, dict) and r.get("success")]
+    tool_result = {
+        "success": bool(succeeded),
+        "type": "multi_tool",
+        "message": "; ".join(
+            f"{name}: {r.get('message') or r.get('error', '')}" for name, r in results.items() if isinstance(r, dict)
+        ),
+        "results": results,
+    }
+    if not succeeded:
+        tool_result["error"] = tool_result["message"] or "All tools failed"
+
+    new_state = {
+        **state,
+        "tool_result": tool_result,
+        "tool_results": {},  # Reset for the next multi-tool turn
+        "chosen_tools": [],
+    }
+    log_node_execution("TOOL_EXECUTION", old_state, new_state, verbose)
+    return new_state
+
+
 def final_response_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
     """Generate final response to user."""
-    old_state = dict(state)
+    old_state = state
     
     tool_result = state.get("tool_result", {})
     messages = list(state.get("messages", []))
@@ -882,7 +993,7 @@ def final_response_node(state: ConversationState, config: dict, llm, verbose: bo
 
 def end_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
     """End the conversation."""
-    old_state = dict(state)
+    old_state = state
     
     new_state = {
         **state,
@@ -894,12 +1005,14 @@ def end_node(state: ConversationState, config: dict, llm, verbose: bool = True)
     return new_state
 
 
-def input_translation_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
+async def input_translation_node(state: ConversationState, config: dict, llm, verbose: bool = True) -> Dict[str, Any]:
     """
     Translate user input from source language to target language (English) for processing.
     Only executes if translation is enabled in config.
     """
     old_state = state.copy()
+    # speculative_decision_node writes this key in the same step
+    old_state.pop("speculative_decision", None)
     
     # Check if translation is enabled
     translation_config = config.get("translation", {})
@@ -937,7 +1050,7 @@ def input_translation_node(state: ConversationState, config: dict, llm, verbose:
     
     try:
         # Perform translation
-        translation_result = llm.invoke(translation_prompt).content.strip()
+        translation_result = (await llm.ainvoke(translation_prompt)).content.strip()
         
         if verbose:
             print(f"Translation result: '{translation_result}'")
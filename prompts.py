@@ -216,6 +216,7 @@ INSTRUCTIONS:
 - Choose "end" when the task is complete or user wants to finish
 - If you see repeated patterns in recent actions, adjust your strategy accordingly
 - Explain your reasoning briefly, referencing recent actions if relevant
+- If several configured tools are needed for the same request and can run independently, list them comma-separated
 
 Return your decision as: DECISION: [one of: {', '.join([t.get('name') for t in tools_cfg if t.get('enabled', True)])}, chat, end] - [brief reason]
 """
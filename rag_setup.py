@@ -9,7 +9,8 @@ import chromadb
 from chromadb.config import Settings
 from pypdf import PdfReader
 from langchain_openai import AzureOpenAIEmbeddings
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from functools import lru_cache
 import hashlib
 
 # Load environment variables from .env file
@@ -35,6 +36,9 @@ class RAGSetup:
             api_version=os.getenv("AZUREOPENAIAPIVERSION", "2024-02-15-preview")
         )
         
+        # Per-instance memo of query embeddings; repeated queries skip the embedding API call
+        self._embed_cached = lru_cache(maxsize=2048)(self._embed_uncached)
+        
         self.chunk_size = 1000
         self.chunk_overlap = 200
         
@@ -162,11 +166,22 @@ class RAGSetup:
             print(f"❌ Error storing in vector database: {e}")
             return False
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, any]]:
-        """Search the vector database for relevant chunks."""
+    def _embed_uncached(self, text: str) -> Tuple[float, ...]:
+        return tuple(self.embedding_model.embed_query(text))
+    
+    def embed_query(self, query: str) -> Tuple[float, ...]:
+        """Embed a query, memoized on its normalized text (tuples so results are hashable)."""
+        return self._embed_cached(query.strip().lower())
+    
+    def search(self, query: str, n_results: int = 5, raise_errors: bool = False) -> List[Dict[str, any]]:
+        """Search the vector database for relevant chunks.
+        
+        Errors are logged and give an empty list unless raise_errors is set, so
+        callers that cache results can tell a failure from "nothing found".
+        """
         try:
             # Generate query embedding using Azure OpenAI
-            query_embedding = self.embedding_model.embed_query(query)
+            query_embedding = list(self.embed_query(query))
             
             # Search in ChromaDB
             results = self.collection.query(
@@ -186,8 +201,35 @@ class RAGSetup:
             return formatted_results
             
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error searching vector database: {e}")
             return []
+    
+    def search_batch(self, queries: List[str], n_results: int = 3) -> List[List[Dict[str, any]]]:
+        """Search several queries with one embedding request and one ChromaDB query."""
+        if not queries:
+            return []
+        try:
+            query_embeddings = self.embedding_model.embed_documents([q.strip().lower() for q in queries])
+            
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results
+            )
+            
+            # One result list per query, in input order
+            return [
+                [
+                    {'text': doc, 'metadata': meta, 'distance': dist}
+                    for doc, meta, dist in zip(docs, metas, dists)
+                ]
+                for docs, metas, dists in zip(results['documents'], results['metadatas'], results['distances'])
+            ]
+            
+        except Exception as e:
+            print(f"Error searching vector database: {e}")
+            return [[] for _ in queries]
 
 
 def setup_rag() -> RAGSetup:
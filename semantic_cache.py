@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Semantic Cache - Embedding-similarity response cache
+Returns a cached tool response when a new query is a close paraphrase of one already answered.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Below this many entries a numpy scan is as fast as FAISS and gives the 8-bit
+# quantizer too few vectors to train its ranges on
+FAISS_MIN_ENTRIES = 256
+# Above this many entries the exact scalar-quantized index is swapped for HNSW
+HNSW_THRESHOLD = 10_000
+# FAISS candidates re-scored against the stored rows per lookup; overwritten rows
+# leave their old vector in the index until the next rebuild, and re-scoring keeps
+# those stale copies from returning the wrong answer
+RESCORE_K = 8
+
+
+def _quantize(v: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Symmetric int8 quantization with a per-vector scale."""
+    scale = float(np.abs(v).max()) / 127 or 1.0
+    return np.round(v / scale).astype(np.int8), scale
+
+
+class SemanticCache:
+    """Cosine-similarity cache over query embeddings with LRU eviction.
+
+    Embeddings are normalized to unit length and stored as int8 rows with a
+    per-row scale, a quarter of the FP32 footprint. Small caches are scanned
+    with an integer matrix-vector product; from FAISS_MIN_ENTRIES on, lookups
+    go through a FAISS 8-bit scalar-quantized index (HNSW past HNSW_THRESHOLD)
+    when faiss is installed. With persist_path set, every insert is written
+    through to a sqlite database so a restart starts warm.
+    """
+
+    def __init__(self, embed: Callable[[str], Sequence[float]], threshold: float = 0.92,
+                 max_entries: int = 1024, ttl: Optional[float] = None,
+                 persist_path: Optional[str] = None,
+                 accept: Optional[Callable[[str], bool]] = None):
+        self.embed = embed
+        self.accept = accept  # responses it rejects are never cached or loaded
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self._Q: Optional[np.ndarray] = None       # (N, d) int8 query embeddings
+        self._scales: Optional[np.ndarray] = None  # (N,) dequantization scale per row
+        self._responses: List[str] = []
+        self._created: List[float] = []
+        self._last_used: List[float] = []
+        self._index = None
+        self._index_trained_on = 0
+        self._index_dirty = False
+        self._stale = 0  # overwrites since the last rebuild
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if persist_path:
+            self.load()
+
+    def _vector(self, query: str) -> Optional[np.ndarray]:
+        q = np.asarray(self.embed(query), dtype=np.float32)
+        norm = np.linalg.norm(q)
+        return q / norm if norm else None
+
+    def _dequantized(self) -> np.ndarray:
+        return self._Q.astype(np.float32) * self._scales[:, None]
+
+    def _use_faiss(self) -> bool:
+        return FAISS_AVAILABLE and len(self._responses) >= FAISS_MIN_ENTRIES
+
+    def _build_index(self) -> None:
+        """(Re)build and train the FAISS index from the stored rows; ids are row positions."""
+        d = self._Q.shape[1]
+        if len(self._responses) > HNSW_THRESHOLD:
+            index = faiss.IndexHNSWSQ(d, faiss.ScalarQuantizer.QT_8bit, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            index.hnsw.efSearch = 64
+        else:
+            index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        vectors = self._dequantized()
+        index.train(vectors)
+        # IDMap so an overwritten row can be re-added under its slot id without a retrain
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+        self._index = index
+        self._index_trained_on = len(self._responses)
+        self._index_dirty = False
+        self._stale = 0
+
+    def _best_match(self, q: np.ndarray) -> Tuple[int, float]:
+        if self._use_faiss():
+            if self._index is None or self._index_dirty:
+                self._build_index()
+            _, I = self._index.search(q.reshape(1, -1), RESCORE_K)
+            rows = np.unique(I[0][I[0] >= 0])
+            if not len(rows):
+                return -1, float("-inf")
+        else:
+            rows = None
+        # int32 accumulation: int8 products summed over d dims overflow int16
+        qq, q_scale = _quantize(q)
+        Q, scales = (self._Q, self._scales) if rows is None else (self._Q[rows], self._scales[rows])
+        sims = (Q.astype(np.int32) @ qq.astype(np.int32)) * scales * q_scale
+        best = int(np.argmax(sims))
+        return (best if rows is None else int(rows[best])), float(sims[best])
+
+    def get(self, query: str) -> Optional[str]:
+        """Return the response cached for the most similar query, or None on a miss."""
+        if self._Q is None:
+            return None
+        q = self._vector(query)
+        if q is None:
+            return None
+        with self._lock:
+            best, score = self._best_match(q)
+            if best < 0 or score < self.threshold:
+                return None
+            now = time.monotonic()
+            if self.ttl is not None and now - self._created[best] > self.ttl:
+                # Expired: make it the next eviction victim; a put of the same query replaces it
+                self._last_used[best] = float("-inf")
+                return None
+            self._last_used[best] = now
+            return self._responses[best]
+
+    def put(self, query: str, response: str) -> None:
+        """Cache a response, replacing a matching entry or evicting the least recently used one."""
+        if self.accept is not None and not self.accept(response):
+            return
+        q = self._vector(query)
+        if q is None:
+            return
+        qq, q_scale = _quantize(q)
+        now = time.monotonic()
+        with self._lock:
+            if self._Q is None:
+                self._Q = qq.reshape(1, -1)
+                self._scales = np.array([q_scale], dtype=np.float32)
+                self._responses = [response]
+                self._created = [now]
+                self._last_used = [now]
+                self._persist(0, query, response, qq, q_scale)
+                return
+            
+            # Replace the row this query already matches (e.g. an expired answer, which
+            # would otherwise win every tie against the fresh copy), else the LRU row
+            # once full. Overwriting in place keeps FAISS ids aligned with list positions
+            best, score = self._best_match(q)
+            if best >= 0 and score >= self.threshold:
+                slot = best
+            elif len(self._responses) >= self.max_entries:
+                slot = int(np.argmin(self._last_used))
+            else:
+                slot = None
+            
+            if slot is not None:
+                self._Q[slot] = qq
+                self._scales[slot] = q_scale
+                self._responses[slot] = response
+                self._created[slot] = now
+                self._last_used[slot] = now
+                if self._index is not None and not self._index_dirty:
+                    # Add the new vector under the same id; rebuild only after a batch of
+                    # overwrites so a full cache does not retrain on every put
+                    self._index.add_with_ids((qq.astype(np.float32) * q_scale).reshape(1, -1),
+                                             np.array([slot], dtype=np.int64))
+                    self._stale += 1
+                    if self._stale > max(32, len(self._responses) // 8):
+                        self._index_dirty = True
+            else:
+                self._Q = np.vstack([self._Q, qq])
+                self._scales = np.append(self._scales, np.float32(q_scale))
+                self._responses.append(response)
+                self._created.append(now)
+                self._last_used.append(now)
+                slot = len(self._responses) - 1
+                if self._index is not None and not self._index_dirty:
+                    n = len(self._responses)
+                    # Retrain once the data has doubled or the index type should change
+                    if n >= 2 * self._index_trained_on or (n > HNSW_THRESHOLD >= self._index_trained_on):
+                        self._index_dirty = True
+                    else:
+                        self._index.add_with_ids((qq.astype(np.float32) * q_scale).reshape(1, -1),
+                                                 np.array([slot], dtype=np.int64))
+            self._persist(slot, query, response, qq, q_scale)
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.persist_path + ".db", check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_meta ("
+            "slot INTEGER PRIMARY KEY, query TEXT, response TEXT, ts REAL, scale REAL, embedding BLOB)"
+        )
+        return conn
+
+    def _persist(self, slot: int, query: str, response: str, qq: np.ndarray, q_scale: float) -> None:
+        """Write one slot through to sqlite; callers hold the lock."""
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_meta VALUES (?, ?, ?, ?, ?, ?)",
+                (slot, query, response, time.time(), q_scale, qq.tobytes()),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not persist semantic cache entry: {e}")
+
+    def load(self) -> bool:
+        """Open the sqlite store at persist_path and warm the cache from it."""
+        try:
+            self._conn = self._connect()
+            stored = self._conn.execute(
+                "SELECT slot, query, response, ts, scale, embedding FROM cache_meta ORDER BY slot"
+            ).fetchall()
+            rows = [row[1:] for row in stored if self.accept is None or self.accept(row[2])][:self.max_entries]
+            if len(rows) != len(stored) or any(row[0] != slot for slot, row in enumerate(stored)):
+                # Drop rejected or surplus rows and renumber so slots match list positions
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache_meta")
+                    self._conn.executemany(
+                        "INSERT INTO cache_meta VALUES (?, ?, ?, ?, ?, ?)",
+                        [(slot, *row) for slot, row in enumerate(rows)],
+                    )
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not load semantic cache: {e}")
+            self._conn = None
+            return False
+        if not rows:
+            return False
+        # Carry each entry's real age over so web answers still expire on schedule
+        wall_now, now = time.time(), time.monotonic()
+        with self._lock:
+            self._Q = np.stack([np.frombuffer(row[4], dtype=np.int8) for row in rows])
+            self._scales = np.array([row[3] for row in rows], dtype=np.float32)
+            self._responses = [row[1] for row in rows]
+            self._created = [now - (wall_now - row[2]) for row in rows]
+            self._last_used = list(self._created)
+            self._index = None
+        return True
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._responses)
@@ -15,6 +15,27 @@ from google_sheets import load_gspread_client, append_to_sheet
 from validation import is_data_complete
 
 
+# Optional fast JSON codec for API payloads; the stdlib json module is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _dumps(obj: Any) -> str:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass  # e.g. non-str keys; the stdlib encoder is more lenient
+    return json.dumps(obj, ensure_ascii=False)
+
+
 # Optional Tavily client
 try:
     from tavily import TavilyClient
@@ -110,7 +131,7 @@ def api_retrieval_tool(extracted_data: Dict[str, Any], config: Dict[str, Any], v
         status = resp.status_code
         text = resp.text
         try:
-            payload = resp.json()
+            payload = _loads(resp.content)
         except Exception:
             payload = None
 
@@ -119,7 +140,7 @@ def api_retrieval_tool(extracted_data: Dict[str, Any], config: Dict[str, Any], v
         preview = ""
         try:
             if isinstance(payload, dict):
-                preview = json.dumps({k: payload[k] for k in list(payload.keys())[:3]}, ensure_ascii=False)
+                preview = _dumps({k: payload[k] for k in list(payload.keys())[:3]})
             elif isinstance(payload, list):
                 preview = f"list[{len(payload)}]"
             else:
@@ -3,6 +3,9 @@
 from typing import Dict, Any, List
 import json
 
+# Number of recent actions kept in state["action_history"] for decision memory
+MAX_ACTION_HISTORY = 5
+
 # Tool Configuration Utilities
 
 def get_selected_tool_config(config: Dict[str, Any], state: Dict[str, Any]):
@@ -198,21 +201,21 @@ def summarize_outcome(old_state: Dict[str, Any], new_state: Dict[str, Any], node
 def track_action(node_name: str, old_state: Dict[str, Any], new_state: Dict[str, Any]):
     """Track action for decision memory (always, regardless of verbose setting)."""
     # Get existing action history
-    action_history = list(old_state.get("action_history", []))
+    previous = old_state.get("action_history") or []
     
     # Create action record
     action_record = {
-        "step": len(action_history) + 1,
+        "step": len(previous) + 1,
         "node": node_name,
         "transition": f"{list(old_state.keys())[0] if old_state else 'start'} → {node_name}",
         "outcome": summarize_outcome(old_state, new_state, node_name),
         "timestamp": len(new_state.get("messages", []))  # Use message count as simple timestamp
     }
     
-    # Add to history (keep only last 5 actions to prevent prompt bloat)
+    # Add to history (keep only the last few actions to prevent prompt bloat);
+    # slicing first means one bounded copy per node instead of copy-then-trim
+    action_history = list(previous[-(MAX_ACTION_HISTORY - 1):])
     action_history.append(action_record)
-    if len(action_history) > 5:
-        action_history = action_history[-5:]
     
     # Update state with action history
     new_state["action_history"] = action_history